@@ -48,3 +48,7 @@ class CacheBackend(ABC):
     def exists(self, cache_key: str) -> bool:
         """Check if a key exists in the cache."""
         pass
+
+    def exists_many(self, cache_keys: Iterable[str]) -> Dict[str, bool]:
+        """Check which of several keys exist in the cache."""
+        return {cache_key: self.exists(cache_key) for cache_key in cache_keys}
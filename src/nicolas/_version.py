@@ -1,6 +1,8 @@
 # type: ignore
 """Version information for nicolas-cache."""
 
+import os
+
 try:
     from importlib.metadata import version, PackageNotFoundError
 except ImportError:
@@ -8,20 +10,23 @@ except ImportError:
     from importlib_metadata import version, PackageNotFoundError
 
 try:
-    __version__ = version("nicolas")
+    __version__ = version("nicolas-cache")
 except PackageNotFoundError:
-    # Package not installed, try to get version from setuptools-scm
-    try:
-        from setuptools_scm import get_version
-        import os
+    # Package not installed. Fallback version in CalVer format (YY.MM.DD)
+    __version__ = "25.07.16-dev"
+
+    # Asking setuptools-scm runs git in a subprocess on every import, so it
+    # is only done when explicitly requested from a source checkout.
+    if os.environ.get("NICOLAS_DEV_VERSION"):
+        try:
+            from setuptools_scm import get_version
 
-        # Get the root directory (two levels up from this file)
-        root_dir = os.path.dirname(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        )
-        __version__ = get_version(root=root_dir)
-    except (ImportError, OSError, LookupError):
-        # Fallback version in CalVer format (YY.MM.DD)
-        __version__ = "25.07.16-dev"
+            # Get the root directory (two levels up from this file)
+            root_dir = os.path.dirname(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            )
+            __version__ = get_version(root=root_dir)
+        except (ImportError, OSError, LookupError):
+            pass
 
 __all__ = ["__version__"]
@@ -1,9 +1,33 @@
-from typing import Any, Dict, Optional, Iterable
+from typing import Any, Callable, Dict, Optional, Iterable
 
 from . import CacheBackend
-from .memory import MemoryCache
-from .redis import RedisCache
-from .sentinel import RedisSentinelCache
+
+
+# Backend modules are imported on first use, so e.g. memory-only users never
+# load the Redis backends.
+def _memory_backend(**kwargs: Any) -> CacheBackend:
+    from .memory import MemoryCache
+
+    return MemoryCache(**kwargs)
+
+
+def _redis_backend(**kwargs: Any) -> CacheBackend:
+    from .redis import RedisCache
+
+    return RedisCache(**kwargs)
+
+
+def _redis_sentinel_backend(**kwargs: Any) -> CacheBackend:
+    from .sentinel import RedisSentinelCache
+
+    return RedisSentinelCache(**kwargs)
+
+
+_BACKENDS: Dict[str, Callable[..., CacheBackend]] = {
+    "memory": _memory_backend,
+    "redis": _redis_backend,
+    "redis-sentinel": _redis_sentinel_backend,
+}
 
 
 class Cache:
@@ -20,16 +44,13 @@ class Cache:
             backend: The backend to use ('memory', 'redis', or 'redis-sentinel')
             **kwargs: Additional arguments to pass to the backend constructor
         """
-        self._backend: CacheBackend
-        if backend == "memory":
-            self._backend = MemoryCache()
-        elif backend == "redis":
-            self._backend = RedisCache(**kwargs)
-        elif backend == "redis-sentinel":
-            self._backend = RedisSentinelCache(**kwargs)
-        else:
+        try:
+            factory = _BACKENDS[backend]
+        except KeyError:
             raise ValueError(f"Unsupported backend: {backend}")
 
+        self._backend: CacheBackend = factory(**kwargs)
+
     def get(self, cache_key: str) -> Any:
         """
         Retrieve a value from the cache by key.
@@ -116,3 +137,15 @@ class Cache:
             True if the key exists in the cache, False otherwise
         """
         return self._backend.exists(cache_key)
+
+    def exists_many(self, cache_keys: Iterable[str]) -> Dict[str, bool]:
+        """
+        Check which of several keys exist in the cache.
+
+        Args:
+            cache_keys: The keys to check
+
+        Returns:
+            A dictionary mapping each key to True if it exists, False otherwise
+        """
+        return self._backend.exists_many(cache_keys)
@@ -1,16 +1,53 @@
-from typing import Any, Dict, Optional, Iterable
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Iterable
 
 from . import CacheBackend
 
+# Tagged-entry ids are renumbered once at least this many have been handed out
+# and fewer than half of them still belong to an entry
+_COMPACT_MIN_IDS = 1024
+
+
+class _Entry:
+    """A cached value together with the tags it is registered under."""
+
+    __slots__ = ("value", "tags", "key_id")
+
+    def __init__(
+        self, value: Any, tags: Optional[FrozenSet[str]] = None, key_id: int = -1
+    ) -> None:
+        self.value = value
+        self.tags = tags
+        self.key_id = key_id  # index into the id -> key table, tagged entries only
+
 
 class MemoryCache(CacheBackend):
     """In-memory implementation of the cache backend with tag support."""
 
-    def __init__(self) -> None:
-        """Initialize an empty in-memory cache with tag registry."""
-        self._cache: Dict[str, Any] = {}
-        self._tag_registry: Dict[str, set[str]] = {}  # tag -> set of cache keys
-        self._key_tags: Dict[str, set[str]] = {}  # cache_key -> set of tags
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        """
+        Initialize an empty in-memory cache with tag registry.
+
+        Args:
+            maxsize: Maximum number of entries to keep. Once reached, the least
+                recently used entry is evicted. Unbounded if None.
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+
+        self._maxsize = maxsize
+        # cache_key -> value and its tags, ordered from least to most recently used
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+        # Tagged entries get an integer id and each tag stores the ids of its
+        # entries in a compact, ascending array. Ids are never reused: a removed
+        # entry leaves a None tombstone in _id_to_key until ids are compacted.
+        self._id_to_key: List[Optional[str]] = []  # id -> cache key
+        self._live_ids = 0  # ids that still belong to an entry
+        self._tag_registry: Dict[str, array[int]] = {}  # tag -> entry ids
+        self._tag_sizes: Dict[str, int] = {}  # tag -> number of live ids
 
     def get(self, cache_key: str) -> Any:
         """
@@ -22,7 +59,12 @@ class MemoryCache(CacheBackend):
         Returns:
             The cached value if the key exists, None otherwise
         """
-        return self._cache.get(cache_key, None)
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        if self._maxsize is not None:
+            self._entries.move_to_end(cache_key)
+        return entry.value
 
     def get_by_tag(self, tag: str) -> Dict[str, Any]:
         """
@@ -34,11 +76,18 @@ class MemoryCache(CacheBackend):
         Returns:
             A dictionary containing all matching cache key-value pairs
         """
-        result = {}
-        if tag in self._tag_registry:
-            for key in self._tag_registry[tag]:
-                if key in self._cache:
-                    result[key] = self._cache[key]
+        tagged_ids = self._tag_registry.get(tag)
+        if tagged_ids is None:
+            return {}
+
+        # Skip the tombstones of removed entries
+        id_to_key = self._id_to_key
+        entries = self._entries
+        result: Dict[str, Any] = {}
+        for key_id in tagged_ids:
+            key = id_to_key[key_id]
+            if key is not None:
+                result[key] = entries[key].value
         return result
 
     def getall(self) -> Dict[str, Any]:
@@ -48,7 +97,7 @@ class MemoryCache(CacheBackend):
         Returns:
             A dictionary containing all cache key-value pairs
         """
-        return self._cache.copy()
+        return {key: entry.value for key, entry in self._entries.items()}
 
     def set(
         self, cache_key: str, value: Any, tags: Optional[Iterable[str]] = None
@@ -61,22 +110,56 @@ class MemoryCache(CacheBackend):
             value: The value to be stored
             tags: Optional list of tags to associate with this cache entry
         """
-        # First, remove any existing tags for this key
-        if cache_key in self._key_tags:
-            self._remove_key_from_tags(cache_key)
-
-        # Store the value
-        self._cache[cache_key] = value
-
-        # Register tags
-        if tags:
-            tag_set = set(tags)
-            self._key_tags[cache_key] = tag_set
+        entry = self._entries.get(cache_key)
+
+        # Fast path for untagged values in an unbounded cache: there are no
+        # tags to unregister and no recency order to maintain
+        if tags is None and self._maxsize is None:
+            if entry is None:
+                self._entries[cache_key] = _Entry(value)
+                return
+            if entry.tags is None:
+                entry.value = value
+                return
 
+        # First, remove any existing tags for this key
+        if entry is not None:
+            self._remove_key_from_tags(entry)
+
+        # Store the value along with its tags. String tags are interned so every
+        # entry and the registry share one object per distinct tag; other
+        # hashable tags are kept as they are.
+        tag_set = (
+            frozenset([sys.intern(tag) if type(tag) is str else tag for tag in tags])
+            if tags
+            else None
+        )
+        if not tag_set:
+            self._entries[cache_key] = _Entry(value)
+        else:
+            # Register tags under a fresh id, so every tag array stays sorted
+            key_id = len(self._id_to_key)
+            self._id_to_key.append(cache_key)
+            self._live_ids += 1
+            self._entries[cache_key] = _Entry(value, tag_set, key_id)
+
+            tag_registry = self._tag_registry
+            tag_sizes = self._tag_sizes
             for tag in tag_set:
-                if tag not in self._tag_registry:
-                    self._tag_registry[tag] = set()
-                self._tag_registry[tag].add(cache_key)
+                tagged_ids = tag_registry.get(tag)
+                if tagged_ids is None:
+                    tag_registry[tag] = array("Q", (key_id,))
+                    tag_sizes[tag] = 1
+                else:
+                    tagged_ids.append(key_id)
+                    tag_sizes[tag] += 1
+
+        if self._maxsize is not None:
+            self._entries.move_to_end(cache_key)
+            # Evict least recently used entries
+            while len(self._entries) > self._maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self._remove_key_from_tags(evicted)
 
     def delete(self, cache_key: str) -> bool:
         """
@@ -88,15 +171,14 @@ class MemoryCache(CacheBackend):
         Returns:
             True if the key was found and deleted, False otherwise
         """
-        if cache_key in self._cache:
-            # Remove from cache
-            del self._cache[cache_key]
-
-            # Remove from tag registry
-            self._remove_key_from_tags(cache_key)
+        # Remove from cache
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return False
 
-            return True
-        return False
+        # Remove from tag registry
+        self._remove_key_from_tags(entry)
+        return True
 
     def delete_by_tag(self, tag: str) -> int:
         """
@@ -108,19 +190,24 @@ class MemoryCache(CacheBackend):
         Returns:
             The number of entries removed
         """
-        if tag not in self._tag_registry:
+        tagged_ids = self._tag_registry.get(tag)
+        if tagged_ids is None:
             return 0
 
-        # Get all keys with this tag
-        keys_to_delete = list(self._tag_registry[tag])
-        count = 0
+        # Get all keys with this tag, skipping tombstones
+        id_to_key = self._id_to_key
+        keys_to_delete = [
+            key
+            for key in [id_to_key[key_id] for key_id in tagged_ids]
+            if key is not None
+        ]
 
         # Delete each key
+        delete = self.delete
         for key in keys_to_delete:
-            if self.delete(key):
-                count += 1
+            delete(key)
 
-        return count
+        return len(keys_to_delete)
 
     def exists(self, cache_key: str) -> bool:
         """
@@ -132,21 +219,78 @@ class MemoryCache(CacheBackend):
         Returns:
             True if the key exists in the cache, False otherwise
         """
-        return cache_key in self._cache
+        return cache_key in self._entries
 
-    def _remove_key_from_tags(self, cache_key: str) -> None:
+    def exists_many(self, cache_keys: Iterable[str]) -> Dict[str, bool]:
         """
-        Remove a key from all tags it's associated with.
+        Check which of several keys exist in the cache.
 
         Args:
-            cache_key: The key to remove from tags
+            cache_keys: The keys to check
+
+        Returns:
+            A dictionary mapping each key to True if it exists, False otherwise
+        """
+        entries = self._entries
+        return {cache_key: cache_key in entries for cache_key in cache_keys}
+
+    def _remove_key_from_tags(self, entry: _Entry) -> None:
         """
-        if cache_key in self._key_tags:
-            for tag in self._key_tags[cache_key]:
-                if tag in self._tag_registry and cache_key in self._tag_registry[tag]:
-                    self._tag_registry[tag].remove(cache_key)
-                    # Clean up empty tag sets
-                    if not self._tag_registry[tag]:
-                        del self._tag_registry[tag]
+        Remove an entry from all tags it's associated with.
 
-            del self._key_tags[cache_key]
+        Args:
+            entry: The entry being removed or replaced
+        """
+        tags = entry.tags
+        if not tags:
+            return
+
+        id_to_key = self._id_to_key
+        id_to_key[entry.key_id] = None
+        self._live_ids -= 1
+
+        tag_registry = self._tag_registry
+        tag_sizes = self._tag_sizes
+        for tag in tags:
+            size = tag_sizes[tag] - 1
+            if not size:
+                # Clean up empty tags
+                del tag_registry[tag]
+                del tag_sizes[tag]
+                continue
+
+            tag_sizes[tag] = size
+            tagged_ids = tag_registry[tag]
+            # Drop tombstones once they make up more than half of the array
+            if len(tagged_ids) > 2 * size:
+                tag_registry[tag] = array(
+                    "Q",
+                    [key_id for key_id in tagged_ids if id_to_key[key_id] is not None],
+                )
+
+        if len(id_to_key) >= _COMPACT_MIN_IDS and len(id_to_key) > 2 * self._live_ids:
+            self._compact_ids()
+
+    def _compact_ids(self) -> None:
+        """Renumber the ids of tagged entries so that no tombstones remain."""
+        old_id_to_key = self._id_to_key
+        entries = self._entries
+        new_ids = [0] * len(old_id_to_key)
+        id_to_key: List[Optional[str]] = []
+        for old_id, key in enumerate(old_id_to_key):
+            if key is not None:
+                new_ids[old_id] = entries[key].key_id = len(id_to_key)
+                id_to_key.append(key)
+
+        # Renumbering preserves order, so the tag arrays stay sorted
+        tag_registry = self._tag_registry
+        for tag, tagged_ids in tag_registry.items():
+            tag_registry[tag] = array(
+                "Q",
+                [
+                    new_ids[key_id]
+                    for key_id in tagged_ids
+                    if old_id_to_key[key_id] is not None
+                ],
+            )
+        self._id_to_key = id_to_key
@@ -1,7 +1,81 @@
-import pickle
-from typing import Any, Dict, Optional, Iterable
+from typing import Any, Dict, Optional, Iterable, List
 
 from . import CacheBackend
+from .serializers import get_dumps, loads
+
+# Maximum number of keys fetched per MGET
+_MGET_BATCH_SIZE = 512
+
+# After this many writes with a TTL, one batch of index entries is checked for
+# expired values, so the index stays bounded even if getall is never called
+_PRUNE_INTERVAL = 100
+
+# Number of index entries SSCAN is asked to return per pruning step
+_PRUNE_BATCH_SIZE = 100
+
+# Number of keys SCAN is asked to examine per call when rebuilding the index
+_SCAN_COUNT = 1000
+
+# Maximum number of keys removed per command by delete_by_tag. Kept well below
+# the limit on the number of values Lua's unpack() can return.
+_DELETE_BATCH_SIZE = 512
+
+# Removes index entries (ARGV[2:]) whose values no longer exist. Checked on the
+# server so a key that is set again concurrently is never dropped.
+_PRUNE_INDEX_LUA = """
+local removed = 0
+for i = 2, #ARGV do
+    if redis.call('EXISTS', ARGV[1] .. ARGV[i]) == 0 then
+        removed = removed + redis.call('SREM', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+# Deletes every entry tagged with KEYS[1] along with its tag bookkeeping and
+# index entry (KEYS[2]). ARGV holds the key, key_tags and tag prefixes.
+# Keys are processed in batches of ARGV[4] so each batch issues one variadic
+# DEL / SREM per affected key rather than one command per key and tag.
+# Returns the number of values that existed and were deleted.
+_DELETE_BY_TAG_LUA = """
+local members = redis.call('SMEMBERS', KEYS[1])
+local batch_size = tonumber(ARGV[4])
+local deleted = 0
+for first = 1, #members, batch_size do
+    local keys, value_keys, key_tags_keys, other_tags = {}, {}, {}, {}
+    for i = first, math.min(first + batch_size - 1, #members) do
+        local key = members[i]
+        local key_tags_key = ARGV[2] .. key
+        keys[#keys + 1] = key
+        value_keys[#value_keys + 1] = ARGV[1] .. key
+        key_tags_keys[#key_tags_keys + 1] = key_tags_key
+        for _, tag in ipairs(redis.call('SMEMBERS', key_tags_key)) do
+            local tag_key = ARGV[3] .. tag
+            if tag_key ~= KEYS[1] then
+                local tagged = other_tags[tag_key]
+                if tagged == nil then
+                    tagged = {}
+                    other_tags[tag_key] = tagged
+                end
+                tagged[#tagged + 1] = key
+            end
+        end
+    end
+    deleted = deleted + redis.call('DEL', unpack(value_keys))
+    redis.call('UNLINK', unpack(key_tags_keys))
+    redis.call('SREM', KEYS[2], unpack(keys))
+    for tag_key, tagged in pairs(other_tags) do
+        redis.call('SREM', tag_key, unpack(tagged))
+    end
+end
+redis.call('UNLINK', KEYS[1])
+return deleted
+"""
+
+
+def _decode_all(items: Iterable[Any]) -> List[str]:
+    """Convert keys or set members returned by Redis (always bytes) to strings."""
+    return list(map(bytes.decode, items))
 
 
 class RedisCache(CacheBackend):
@@ -14,16 +88,34 @@ class RedisCache(CacheBackend):
         db: int = 0,
         password: Optional[str] = None,
         prefix: str = "cache:",
+        serializer: str = "pickle",
+        max_connections: Optional[int] = None,
+        socket_timeout: Optional[float] = None,
+        socket_keepalive: bool = True,
+        socket_keepalive_options: Optional[Dict[int, int]] = None,
+        redis_client: Optional[Any] = None,
     ) -> None:
         """
         Initialize a Redis cache connection.
 
+        All connections come from a thread-safe pool shared by every
+        operation on this cache.
+
         Args:
-            host: Redis server hostname
+            host: Redis server hostname, or the path of a Unix domain socket
             port: Redis server port
             db: Redis database number
             password: Redis password (if required)
             prefix: Key prefix to use for all cache entries
+            serializer: Value serializer ('pickle', 'orjson', 'msgpack', or
+                'auto' for msgpack on plain data and pickle for everything else)
+            max_connections: Maximum number of pooled connections (unbounded if None)
+            socket_timeout: Socket timeout for Redis commands
+            socket_keepalive: Enable TCP keepalive
+            socket_keepalive_options: TCP keepalive options
+            redis_client: An existing client to use instead of creating one.
+                It must not decode responses. The connection options above
+                are ignored when it is given.
         """
         try:
             import redis  # type: ignore
@@ -32,28 +124,56 @@ class RedisCache(CacheBackend):
                 "Redis package is required. Install with: pip install redis"
             )
 
-        self.redis = redis.Redis(
-            host=host,
-            port=port,
-            db=db,
-            password=password,
-            decode_responses=False,  # We want bytes to handle serialized data
-        )
+        if redis_client is None:
+            connection_kwargs: Dict[str, Any] = {
+                "db": db,
+                "password": password,
+                "socket_timeout": socket_timeout,
+                "decode_responses": False,  # We want bytes to handle serialized data
+            }
+            if host.startswith("/"):
+                connection_kwargs["connection_class"] = redis.UnixDomainSocketConnection
+                connection_kwargs["path"] = host
+            else:
+                connection_kwargs["host"] = host
+                connection_kwargs["port"] = port
+                connection_kwargs["socket_keepalive"] = socket_keepalive
+                connection_kwargs["socket_keepalive_options"] = (
+                    socket_keepalive_options or {}
+                )
+
+            pool = redis.ConnectionPool(
+                max_connections=max_connections, **connection_kwargs
+            )
+            redis_client = redis.Redis(connection_pool=pool)
+
+        self.redis = redis_client
         self.prefix = prefix
         self.tag_prefix = f"{prefix}tag:"
         self.key_tags_prefix = f"{prefix}key_tags:"
+        # Set of all data cache keys. It lives outside the prefix so that no
+        # cache key can collide with it. The second key records that entries
+        # written before the index existed have been added to it.
+        self.index_key = f"__index__:{prefix}"
+        self.index_built_key = f"__index_built__:{prefix}"
+        self._index_built = False
+        self._ttl_writes = 0  # writes with a TTL since the last pruning step
+        self._prune_cursor = 0  # SSCAN cursor of the next pruning step
+        self._prune_index = self.redis.register_script(_PRUNE_INDEX_LUA)
+        self._delete_by_tag = self.redis.register_script(_DELETE_BY_TAG_LUA)
+        self._dumps = get_dumps(serializer)
 
     def _get_key(self, cache_key: str) -> str:
         """Add prefix to the cache key."""
-        return f"{self.prefix}{cache_key}"
+        return self.prefix + cache_key
 
     def _get_tag_key(self, tag: str) -> str:
         """Get the Redis key for a tag set."""
-        return f"{self.tag_prefix}{tag}"
+        return self.tag_prefix + tag
 
     def _get_key_tags_key(self, cache_key: str) -> str:
         """Get the Redis key for storing a key's tags."""
-        return f"{self.key_tags_prefix}{cache_key}"
+        return self.key_tags_prefix + cache_key
 
     def get(self, cache_key: str) -> Any:
         """
@@ -68,7 +188,7 @@ class RedisCache(CacheBackend):
         value = self.redis.get(self._get_key(cache_key))
         if value is None:
             return None
-        return pickle.loads(value)
+        return loads(value)
 
     def get_by_tag(self, tag: str) -> Dict[str, Any]:
         """
@@ -88,15 +208,10 @@ class RedisCache(CacheBackend):
         if not tagged_keys:
             return result
 
-        # Get values for each key
-        for key_bytes in tagged_keys:
-            cache_key = (
-                key_bytes.decode("utf-8") if isinstance(key_bytes, bytes) else key_bytes
-            )
-            value = self.get(cache_key)
-            if value is not None:
-                result[cache_key] = value
+        cache_keys = _decode_all(tagged_keys)
 
+        # Fetch all values in MGET batches
+        self._get_many(cache_keys, result)
         return result
 
     def getall(self) -> Dict[str, Any]:
@@ -106,24 +221,28 @@ class RedisCache(CacheBackend):
         Returns:
             A dictionary containing all cache key-value pairs
         """
-        prefix_len = len(self.prefix)
-        # Only get data keys, not tag registry keys
-        keys = self.redis.keys(f"{self.prefix}*")
         result: Dict[str, Any] = {}
 
-        for key in keys:
-            # Skip tag registry keys
-            str_key = key.decode("utf-8") if isinstance(key, bytes) else key
-            if str_key.startswith(self.tag_prefix) or str_key.startswith(
-                self.key_tags_prefix
-            ):
-                continue
+        # Entries written before the index existed are added to it once
+        if not self._index_built:
+            if not self.redis.exists(self.index_built_key):
+                self.rebuild_index()
+            self._index_built = True
+
+        # Get all data keys from the index
+        indexed_keys = self.redis.smembers(self.index_key)
+        if not indexed_keys:
+            return result
+
+        cache_keys = _decode_all(indexed_keys)
 
-            # Process data key
-            clean_key = str_key[prefix_len:]
-            value = self.redis.get(key)
-            if value is not None:
-                result[clean_key] = pickle.loads(value)
+        # Fetch all values in MGET batches
+        self._get_many(cache_keys, result)
+
+        # Drop index entries whose values have expired
+        stale_keys = [k for k in cache_keys if k not in result]
+        if stale_keys:
+            self._prune_index(keys=[self.index_key], args=[self.prefix, *stale_keys])
 
         return result
 
@@ -143,15 +262,18 @@ class RedisCache(CacheBackend):
             tags: Optional list of tags to associate with this cache entry
             ttl: Time-to-live in seconds (optional)
         """
+        pipe = self.redis.pipeline(transaction=True)
+
         # First, remove any existing tags for this key
-        self._remove_key_from_tags(cache_key)
+        self._remove_key_from_tags(cache_key, pipe)
 
         # Store the value
-        serialized = pickle.dumps(value)
+        serialized = self._dumps(value)
         if ttl is not None:
-            self.redis.setex(self._get_key(cache_key), ttl, serialized)
+            pipe.setex(self._get_key(cache_key), ttl, serialized)
         else:
-            self.redis.set(self._get_key(cache_key), serialized)
+            pipe.set(self._get_key(cache_key), serialized)
+        pipe.sadd(self.index_key, cache_key)
 
         # Register tags
         if tags:
@@ -160,16 +282,25 @@ class RedisCache(CacheBackend):
             # Store tags for this key
             key_tags_key = self._get_key_tags_key(cache_key)
             if tag_set:
-                self.redis.sadd(key_tags_key, *tag_set)
+                pipe.sadd(key_tags_key, *tag_set)
                 if ttl is not None:
-                    self.redis.expire(key_tags_key, ttl)
+                    pipe.expire(key_tags_key, ttl)
 
             # Add key to each tag's set
+            tag_prefix = self.tag_prefix
+            sadd = pipe.sadd
             for tag in tag_set:
-                tag_key = self._get_tag_key(tag)
-                self.redis.sadd(tag_key, cache_key)
+                sadd(tag_prefix + tag, cache_key)
                 # No TTL on tag keys - they'll be cleaned up when empty
 
+        pipe.execute()
+
+        if ttl is not None:
+            self._ttl_writes += 1
+            if self._ttl_writes >= _PRUNE_INTERVAL:
+                self._ttl_writes = 0
+                self._prune_index_step()
+
     def delete(self, cache_key: str) -> bool:
         """
         Remove an entry from the cache by its key.
@@ -180,16 +311,15 @@ class RedisCache(CacheBackend):
         Returns:
             True if the key was found and deleted, False otherwise
         """
-        # Check if key exists
-        if not self.exists(cache_key):
-            return False
+        pipe = self.redis.pipeline(transaction=True)
 
-        # Remove from tag registry
-        self._remove_key_from_tags(cache_key)
+        # Remove the value; DEL's reply tells whether the key existed
+        pipe.delete(self._get_key(cache_key))
+        pipe.srem(self.index_key, cache_key)
 
-        # Remove the value
-        self.redis.delete(self._get_key(cache_key))
-        return True
+        # Remove from tag registry
+        self._remove_key_from_tags(cache_key, pipe)
+        return bool(pipe.execute()[0])
 
     def delete_by_tag(self, tag: str) -> int:
         """
@@ -201,25 +331,18 @@ class RedisCache(CacheBackend):
         Returns:
             The number of entries removed
         """
-        tag_key = self._get_tag_key(tag)
-
-        # Get all keys with this tag
-        keys = self.redis.smembers(tag_key)
-        if not keys:
-            return 0
-
-        # Convert bytes to strings if needed
-        keys_to_delete = [
-            k.decode("utf-8") if isinstance(k, bytes) else k for k in keys
-        ]
-
-        # Delete each key
-        count = 0
-        for key in keys_to_delete:
-            if self.delete(key):
-                count += 1
-
-        return count
+        # Runs entirely on the server in a single round-trip
+        return int(
+            self._delete_by_tag(
+                keys=[self._get_tag_key(tag), self.index_key],
+                args=[
+                    self.prefix,
+                    self.key_tags_prefix,
+                    self.tag_prefix,
+                    _DELETE_BATCH_SIZE,
+                ],
+            )
+        )
 
     def exists(self, cache_key: str) -> bool:
         """
@@ -233,12 +356,105 @@ class RedisCache(CacheBackend):
         """
         return bool(self.redis.exists(self._get_key(cache_key)))
 
-    def _remove_key_from_tags(self, cache_key: str) -> None:
+    def exists_many(self, cache_keys: Iterable[str]) -> Dict[str, bool]:
         """
-        Remove a key from all tags it's associated with.
+        Check which of several keys exist in the cache in one round-trip.
+
+        Args:
+            cache_keys: The keys to check
+
+        Returns:
+            A dictionary mapping each key to True if it exists, False otherwise
+        """
+        keys = list(cache_keys)
+        if not keys:
+            return {}
+
+        # A variadic EXISTS only returns a count, so each key gets its own
+        # EXISTS in a single pipeline
+        prefix = self.prefix
+        pipe = self.redis.pipeline(transaction=False)
+        exists = pipe.exists
+        for cache_key in keys:
+            exists(prefix + cache_key)
+        return {
+            cache_key: bool(found) for cache_key, found in zip(keys, pipe.execute())
+        }
+
+    def rebuild_index(self) -> int:
+        """
+        Add every data key under the prefix to the index used by getall().
+
+        This walks the keyspace with SCAN, so it does not block the server.
+        getall() runs it once automatically when it finds no record of a
+        previous rebuild, which picks up entries written by versions without
+        the index.
+
+        Returns:
+            The number of data keys found
+        """
+        prefix_len = len(self.prefix)
+        registry_prefixes = (self.tag_prefix, self.key_tags_prefix)
+        keys = self.redis.scan_iter(match=f"{self.prefix}*", count=_SCAN_COUNT)
+        cache_keys = [
+            key[prefix_len:]
+            for key in _decode_all(keys)
+            if not key.startswith(registry_prefixes)  # Skip tag registry keys
+        ]
+
+        pipe = self.redis.pipeline(transaction=False)
+        for start in range(0, len(cache_keys), _MGET_BATCH_SIZE):
+            pipe.sadd(self.index_key, *cache_keys[start : start + _MGET_BATCH_SIZE])
+        pipe.set(self.index_built_key, 1)
+        pipe.execute()
+        return len(cache_keys)
+
+    def _prune_index_step(self) -> None:
+        """Drop the index entries of expired values from the next SSCAN batch."""
+        cursor, members = self.redis.sscan(
+            self.index_key, self._prune_cursor, count=_PRUNE_BATCH_SIZE
+        )
+        self._prune_cursor = cursor
+        if members:
+            self._prune_index(
+                keys=[self.index_key], args=[self.prefix, *_decode_all(members)]
+            )
+
+    def _get_many(self, cache_keys: List[str], result: Dict[str, Any]) -> None:
+        """
+        Fetch several values with batched MGETs and add them to ``result``.
+
+        Keys that no longer exist are skipped.
+
+        Args:
+            cache_keys: The (unprefixed) keys to fetch
+            result: The dictionary to add the key-value pairs to
+        """
+        prefix = self.prefix
+        mget = self.redis.mget
+        deserialize = loads
+        for start in range(0, len(cache_keys), _MGET_BATCH_SIZE):
+            batch = cache_keys[start : start + _MGET_BATCH_SIZE]
+            values = mget([prefix + k for k in batch])
+            result.update(
+                {
+                    cache_key: deserialize(value)
+                    for cache_key, value in zip(batch, values)
+                    if value is not None
+                }
+            )
+
+    def _remove_key_from_tags(self, cache_key: str, pipe: Any) -> None:
+        """
+        Queue the removal of a key from all tags it's associated with.
+
+        The key's current tags are read immediately; the removals are queued
+        on ``pipe`` and sent when the caller executes it. Redis deletes a set
+        once its last member is removed, so empty tag sets need no cleanup.
 
         Args:
             cache_key: The key to remove from tags
+            pipe: The pipeline to queue the removals on
         """
         key_tags_key = self._get_key_tags_key(cache_key)
 
@@ -246,16 +462,10 @@ class RedisCache(CacheBackend):
         tags = self.redis.smembers(key_tags_key)
 
         # Remove key from each tag's set
-        for tag_bytes in tags:
-            tag = (
-                tag_bytes.decode("utf-8") if isinstance(tag_bytes, bytes) else tag_bytes
-            )
-            tag_key = self._get_tag_key(tag)
-            self.redis.srem(tag_key, cache_key)
-
-            # Remove tag key if empty
-            if self.redis.scard(tag_key) == 0:
-                self.redis.delete(tag_key)
+        tag_prefix = self.tag_prefix
+        srem = pipe.srem
+        for tag in _decode_all(tags):
+            srem(tag_prefix + tag, cache_key)
 
         # Remove key's tag set
-        self.redis.delete(key_tags_key)
+        pipe.unlink(key_tags_key)
@@ -1,7 +1,52 @@
-import pickle
 from typing import Any, Dict, Optional, Iterable, List, Tuple
 
 from . import CacheBackend
+from .serializers import get_dumps, loads
+
+# Maximum number of keys fetched per MGET
+_MGET_BATCH_SIZE = 512
+
+# Number of keys SCAN is asked to examine per call
+_SCAN_COUNT = 1000
+
+# Stores a value (KEYS[1]) and replaces its tags atomically. KEYS[2] is the
+# key's tag set; ARGV holds the serialized value, the TTL ('' for none), the
+# cache key, the tag prefix and then the new tags.
+# No TTL on tag keys - Redis removes them once their last member is removed.
+_SET_WITH_TAGS_LUA = """
+local cache_key, tag_prefix = ARGV[3], ARGV[4]
+for _, tag in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    redis.call('SREM', tag_prefix .. tag, cache_key)
+end
+redis.call('UNLINK', KEYS[2])
+if ARGV[2] == '' then
+    redis.call('SET', KEYS[1], ARGV[1])
+else
+    redis.call('SETEX', KEYS[1], ARGV[2], ARGV[1])
+end
+if #ARGV > 4 then
+    redis.call('SADD', KEYS[2], unpack(ARGV, 5))
+    if ARGV[2] ~= '' then
+        redis.call('EXPIRE', KEYS[2], ARGV[2])
+    end
+    for i = 5, #ARGV do
+        redis.call('SADD', tag_prefix .. ARGV[i], cache_key)
+    end
+end
+return redis.status_reply('OK')
+"""
+
+# Deletes a value (KEYS[1]) and removes it from all its tags in one step.
+# KEYS[2] is the key's tag set; ARGV holds the cache key and the tag prefix.
+# Returns the number of values deleted (0 or 1).
+_DELETE_LUA = """
+local deleted = redis.call('DEL', KEYS[1])
+for _, tag in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    redis.call('SREM', ARGV[2] .. tag, ARGV[1])
+end
+redis.call('UNLINK', KEYS[2])
+return deleted
+"""
 
 
 class RedisSentinelCache(CacheBackend):
@@ -20,6 +65,9 @@ class RedisSentinelCache(CacheBackend):
         socket_keepalive: bool = True,
         socket_keepalive_options: Optional[Dict[str, Any]] = None,
         decode_responses: bool = False,
+        serializer: str = "pickle",
+        max_connections: Optional[int] = None,
+        health_check_interval: int = 30,
     ):
         """
         Initialize a Redis Sentinel cache connection with automatic failover.
@@ -36,6 +84,12 @@ class RedisSentinelCache(CacheBackend):
             socket_keepalive: Enable TCP keepalive
             socket_keepalive_options: TCP keepalive options
             decode_responses: Whether to decode responses (kept False for pickle)
+            serializer: Value serializer ('pickle', 'orjson', 'msgpack', or
+                'auto' for msgpack on plain data and pickle for everything else)
+            max_connections: Maximum number of pooled connections to the master
+                and to the replicas each (unbounded if None)
+            health_check_interval: Seconds a pooled connection may sit idle
+                before it is checked with PING on reuse (0 disables the check)
         """
         try:
             from redis.sentinel import Sentinel  # type: ignore
@@ -66,41 +120,46 @@ class RedisSentinelCache(CacheBackend):
         self.prefix = prefix
         self.tag_prefix = f"{prefix}tag:"
         self.key_tags_prefix = f"{prefix}key_tags:"
-
-        # Test the connection by discovering master
-        self._get_master()
+        self._dumps = get_dumps(serializer)
+
+        # Create the master/slave clients once. They look up the current
+        # master or a replica through Sentinel whenever they (re)connect, so
+        # reusing them keeps failover working. Each client has its own
+        # SentinelConnectionPool, which the pool options below configure.
+        client_kwargs = {
+            "socket_timeout": 0.1,
+            "db": db,
+            "password": password,
+            "decode_responses": decode_responses,
+            "max_connections": max_connections,
+            "health_check_interval": health_check_interval,
+        }
+        self._master = self.sentinel.master_for(service_name, **client_kwargs)
+        self._slave = self.sentinel.slave_for(service_name, **client_kwargs)
+
+        # Sent with EVALSHA; reloaded automatically if the master changes
+        self._set_with_tags = self._master.register_script(_SET_WITH_TAGS_LUA)
+        self._delete = self._master.register_script(_DELETE_LUA)
 
     def _get_master(self) -> Any:
-        """Get the current master connection from Sentinel."""
-        return self.sentinel.master_for(
-            self.service_name,
-            socket_timeout=0.1,
-            db=self.db,
-            password=self.password,
-            decode_responses=self.decode_responses,
-        )
+        """Get the master connection from Sentinel."""
+        return self._master
 
     def _get_slave(self) -> Any:
         """Get a slave connection for read operations."""
-        return self.sentinel.slave_for(
-            self.service_name,
-            socket_timeout=0.1,
-            db=self.db,
-            password=self.password,
-            decode_responses=self.decode_responses,
-        )
+        return self._slave
 
     def _get_key(self, cache_key: str) -> str:
         """Add prefix to the cache key."""
-        return f"{self.prefix}{cache_key}"
+        return self.prefix + cache_key
 
     def _get_tag_key(self, tag: str) -> str:
         """Get the Redis key for a tag set."""
-        return f"{self.tag_prefix}{tag}"
+        return self.tag_prefix + tag
 
     def _get_key_tags_key(self, cache_key: str) -> str:
         """Get the Redis key for storing a key's tags."""
-        return f"{self.key_tags_prefix}{cache_key}"
+        return self.key_tags_prefix + cache_key
 
     def get(self, cache_key: str) -> Any:
         """
@@ -117,7 +176,7 @@ class RedisSentinelCache(CacheBackend):
         value = redis.get(self._get_key(cache_key))
         if value is None:
             return None
-        return pickle.loads(value)
+        return loads(value)
 
     def get_by_tag(self, tag: str) -> Dict[str, Any]:
         """
@@ -140,15 +199,10 @@ class RedisSentinelCache(CacheBackend):
         if not tagged_keys:
             return result
 
-        # Get values for each key
-        for key_bytes in tagged_keys:
-            cache_key = (
-                key_bytes.decode("utf-8") if isinstance(key_bytes, bytes) else key_bytes
-            )
-            value = self.get(cache_key)
-            if value is not None:
-                result[cache_key] = value
+        cache_keys = self._decode_all(tagged_keys)
 
+        # Fetch all values in MGET batches
+        self._get_many(redis, cache_keys, result)
         return result
 
     def getall(self) -> Dict[str, Any]:
@@ -159,27 +213,22 @@ class RedisSentinelCache(CacheBackend):
             A dictionary containing all cache key-value pairs
         """
         prefix_len = len(self.prefix)
+        registry_prefixes = (self.tag_prefix, self.key_tags_prefix)
         # Use slave for read operations
         redis = self._get_slave()
 
-        # Only get data keys, not tag registry keys
-        keys = redis.keys(f"{self.prefix}*")
-        result: Dict[str, Any] = {}
-
-        for key in keys:
-            # Skip tag registry keys
-            str_key = key.decode("utf-8") if isinstance(key, bytes) else key
-            if str_key.startswith(self.tag_prefix) or str_key.startswith(
-                self.key_tags_prefix
-            ):
-                continue
-
-            # Process data key
-            clean_key = str_key[prefix_len:]
-            value = redis.get(key)
-            if value is not None:
-                result[clean_key] = pickle.loads(value)
+        # Only get data keys, not tag registry keys. SCAN walks the keyspace
+        # in small steps rather than blocking the server like KEYS does.
+        keys = redis.scan_iter(match=f"{self.prefix}*", count=_SCAN_COUNT)
+        cache_keys = [
+            key[prefix_len:]
+            for key in self._decode_all(keys)
+            if not key.startswith(registry_prefixes)  # Skip tag registry keys
+        ]
 
+        # Fetch all values in MGET batches
+        result: Dict[str, Any] = {}
+        self._get_many(redis, cache_keys, result)
         return result
 
     def set(
@@ -198,35 +247,19 @@ class RedisSentinelCache(CacheBackend):
             tags: Optional list of tags to associate with this cache entry
             ttl: Time-to-live in seconds (optional)
         """
-        # Use master for write operations
-        redis = self._get_master()
-
-        # First, remove any existing tags for this key
-        self._remove_key_from_tags(cache_key)
-
-        # Store the value
-        serialized = pickle.dumps(value)
-        if ttl is not None:
-            redis.setex(self._get_key(cache_key), ttl, serialized)
-        else:
-            redis.set(self._get_key(cache_key), serialized)
-
-        # Register tags
-        if tags:
-            tag_set = set(tags)
-
-            # Store tags for this key
-            key_tags_key = self._get_key_tags_key(cache_key)
-            if tag_set:
-                redis.sadd(key_tags_key, *tag_set)
-                if ttl is not None:
-                    redis.expire(key_tags_key, ttl)
-
-            # Add key to each tag's set
-            for tag in tag_set:
-                tag_key = self._get_tag_key(tag)
-                redis.sadd(tag_key, cache_key)
-                # No TTL on tag keys - they'll be cleaned up when empty
+        tag_set = set(tags) if tags else ()
+
+        # Runs entirely on the master in a single round-trip
+        self._set_with_tags(
+            keys=[self._get_key(cache_key), self._get_key_tags_key(cache_key)],
+            args=[
+                self._dumps(value),
+                "" if ttl is None else ttl,
+                cache_key,
+                self.tag_prefix,
+                *tag_set,
+            ],
+        )
 
     def delete(self, cache_key: str) -> bool:
         """
@@ -238,19 +271,12 @@ class RedisSentinelCache(CacheBackend):
         Returns:
             True if the key was found and deleted, False otherwise
         """
-        # Check if key exists
-        if not self.exists(cache_key):
-            return False
-
-        # Use master for write operations
-        redis = self._get_master()
-
-        # Remove from tag registry
-        self._remove_key_from_tags(cache_key)
-
-        # Remove the value
-        redis.delete(self._get_key(cache_key))
-        return True
+        # Runs entirely on the master in a single round-trip
+        deleted = self._delete(
+            keys=[self._get_key(cache_key), self._get_key_tags_key(cache_key)],
+            args=[cache_key, self.tag_prefix],
+        )
+        return bool(deleted)
 
     def delete_by_tag(self, tag: str) -> int:
         """
@@ -264,26 +290,46 @@ class RedisSentinelCache(CacheBackend):
         """
         tag_key = self._get_tag_key(tag)
 
-        # Use slave for read, master will be used in delete()
-        redis = self._get_slave()
+        # Use master for reads too, so entries not yet replicated are included
+        redis = self._get_master()
 
         # Get all keys with this tag
         keys = redis.smembers(tag_key)
         if not keys:
             return 0
 
-        # Convert bytes to strings if needed
-        keys_to_delete = [
-            k.decode("utf-8") if isinstance(k, bytes) else k for k in keys
-        ]
-
-        # Delete each key
-        count = 0
-        for key in keys_to_delete:
-            if self.delete(key):
-                count += 1
-
-        return count
+        keys_to_delete = self._decode_all(keys)
+
+        prefix = self.prefix
+        tag_prefix = self.tag_prefix
+        key_tags_keys = [self.key_tags_prefix + key for key in keys_to_delete]
+
+        # Read the tags of every key in one round-trip
+        pipe = redis.pipeline(transaction=False)
+        smembers = pipe.smembers
+        for key_tags_key in key_tags_keys:
+            smembers(key_tags_key)
+        key_tags = pipe.execute()
+
+        # Group the keys by the other tags they need to be removed from
+        other_tags: Dict[str, List[str]] = {}
+        group = other_tags.setdefault
+        decode_all = self._decode_all
+        for key, tags in zip(keys_to_delete, key_tags):
+            for other_tag in decode_all(tags):
+                other_tag_key = tag_prefix + other_tag
+                if other_tag_key != tag_key:
+                    group(other_tag_key, []).append(key)
+
+        # Delete everything in one round-trip; the first reply counts the
+        # values that still existed
+        pipe = redis.pipeline(transaction=True)
+        pipe.delete(*[prefix + key for key in keys_to_delete])
+        pipe.unlink(*key_tags_keys)
+        for other_tag_key, tagged_keys in other_tags.items():
+            pipe.srem(other_tag_key, *tagged_keys)
+        pipe.unlink(tag_key)
+        return int(pipe.execute()[0])
 
     def exists(self, cache_key: str) -> bool:
         """
@@ -299,32 +345,71 @@ class RedisSentinelCache(CacheBackend):
         redis = self._get_slave()
         return bool(redis.exists(self._get_key(cache_key)))
 
-    def _remove_key_from_tags(self, cache_key: str) -> None:
+    def exists_many(self, cache_keys: Iterable[str]) -> Dict[str, bool]:
         """
-        Remove a key from all tags it's associated with.
+        Check which of several keys exist in the cache in one round-trip.
 
         Args:
-            cache_key: The key to remove from tags
+            cache_keys: The keys to check
+
+        Returns:
+            A dictionary mapping each key to True if it exists, False otherwise
         """
-        key_tags_key = self._get_key_tags_key(cache_key)
+        keys = list(cache_keys)
+        if not keys:
+            return {}
+
+        # Use slave for read operations. A variadic EXISTS only returns a
+        # count, so each key gets its own EXISTS in a single pipeline.
+        prefix = self.prefix
+        pipe = self._get_slave().pipeline(transaction=False)
+        exists = pipe.exists
+        for cache_key in keys:
+            exists(prefix + cache_key)
+        return {
+            cache_key: bool(found) for cache_key, found in zip(keys, pipe.execute())
+        }
+
+    def _decode_all(self, items: Iterable[Any]) -> List[str]:
+        """
+        Convert keys or set members returned by Redis to strings.
 
-        # Use master for write operations
-        redis = self._get_master()
+        Replies are bytes unless the clients decode responses themselves, so
+        the check is made once per call rather than once per item.
+
+        Args:
+            items: The keys or members returned by Redis
 
-        # Get all tags for this key
-        tags = redis.smembers(key_tags_key)
+        Returns:
+            The items as strings
+        """
+        if self.decode_responses:
+            return list(items)
+        return list(map(bytes.decode, items))
 
-        # Remove key from each tag's set
-        for tag_bytes in tags:
-            tag = (
-                tag_bytes.decode("utf-8") if isinstance(tag_bytes, bytes) else tag_bytes
-            )
-            tag_key = self._get_tag_key(tag)
-            redis.srem(tag_key, cache_key)
+    def _get_many(
+        self, redis: Any, cache_keys: List[str], result: Dict[str, Any]
+    ) -> None:
+        """
+        Fetch several values with batched MGETs and add them to ``result``.
 
-            # Remove tag key if empty
-            if redis.scard(tag_key) == 0:
-                redis.delete(tag_key)
+        Keys that no longer exist are skipped.
 
-        # Remove key's tag set
-        redis.delete(key_tags_key)
+        Args:
+            redis: The connection to read from
+            cache_keys: The (unprefixed) keys to fetch
+            result: The dictionary to add the key-value pairs to
+        """
+        prefix = self.prefix
+        mget = redis.mget
+        deserialize = loads
+        for start in range(0, len(cache_keys), _MGET_BATCH_SIZE):
+            batch = cache_keys[start : start + _MGET_BATCH_SIZE]
+            values = mget([prefix + k for k in batch])
+            result.update(
+                {
+                    cache_key: deserialize(value)
+                    for cache_key, value in zip(batch, values)
+                    if value is not None
+                }
+            )
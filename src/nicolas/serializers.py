@@ -0,0 +1,162 @@
+"""Value serializers for the Redis-based cache backends."""
+
+import importlib
+import pickle
+import sys
+import threading
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional
+
+# Format tags prepended to serialized values so payloads written with
+# different serializers stay decodable. Pickle data is stored untagged: its
+# output (protocol 2+) always starts with the PROTO opcode, which keeps
+# values written by earlier versions readable.
+_ORJSON_TAG = b"J"
+_MSGPACK_TAG = b"M"
+_NUMPY_TAG = b"N"  # followed by b"<dtype>:<shape>\n" and the raw array data
+
+# Types that round-trip through msgpack unchanged. Exact types are checked so
+# subclasses (and tuples, which msgpack turns into lists) fall back to pickle.
+_MSGPACK_SCALARS = frozenset([str, int, float, bool, bytes, type(None)])
+_MSGPACK_KEYS = frozenset([str, bytes])  # map keys 'auto' sends to msgpack
+_MSGPACK_MAX_DEPTH = 64  # deeper containers are left to pickle
+
+# Per-thread msgpack packers; a packer reuses its internal buffer across calls
+# but is not safe to share between threads
+_packers = threading.local()
+
+
+@lru_cache(maxsize=None)
+def _require(name: str) -> Any:
+    """Import an optional serializer package."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(
+            f"{name} package is required. Install with: pip install {name}"
+        )
+
+
+def get_dumps(serializer: str) -> Callable[[Any], bytes]:
+    """
+    Get the function that serializes values with the given serializer.
+
+    Args:
+        serializer: The serializer to use ('pickle', 'orjson', 'msgpack', or
+            'auto' for msgpack on plain data and pickle for everything else)
+
+    Returns:
+        A function turning a value into bytes that ``loads`` can decode
+    """
+    if serializer == "pickle":
+        return partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL)
+    if serializer == "orjson":
+        orjson_dumps = _require("orjson").dumps
+        return lambda value: _ORJSON_TAG + orjson_dumps(value)
+    if serializer == "msgpack":
+        _require("msgpack")
+        return _msgpack_dumps
+    if serializer == "auto":
+        _require("msgpack")
+        return _auto_dumps
+    raise ValueError(f"Unsupported serializer: {serializer}")
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    """Serialize a value with this thread's msgpack packer."""
+    try:
+        packer = _packers.packer
+    except AttributeError:
+        packer = _packers.packer = _require("msgpack").Packer(use_bin_type=True)
+    return _MSGPACK_TAG + packer.pack(value)
+
+
+def _is_msgpack_native(value: Any, depth: int = 0) -> bool:
+    """Check whether a value consists only of types msgpack round-trips."""
+    value_type = type(value)
+    if value_type in _MSGPACK_SCALARS:
+        return True
+    if depth >= _MSGPACK_MAX_DEPTH:
+        return False
+    if value_type is list:
+        for item in value:
+            if not _is_msgpack_native(item, depth + 1):
+                return False
+        return True
+    if value_type is dict:
+        for key, item in value.items():
+            if type(key) not in _MSGPACK_KEYS or not _is_msgpack_native(
+                item, depth + 1
+            ):
+                return False
+        return True
+    return False
+
+
+def _numpy_dumps(value: Any) -> Optional[bytes]:
+    """
+    Serialize a plain numpy array as a small header plus its raw data.
+
+    Returns None for anything else, including arrays of Python objects or
+    structured dtypes, whose raw bytes do not describe the values.
+    """
+    # A value can only be an array if numpy has already been imported
+    numpy = sys.modules.get("numpy")
+    if numpy is None or type(value) is not numpy.ndarray:
+        return None
+    dtype = value.dtype
+    if dtype.hasobject or dtype.fields is not None:
+        return None
+    shape = ",".join([str(dim) for dim in value.shape])
+    header = f"{dtype.str}:{shape}\n".encode("ascii")
+    return _NUMPY_TAG + header + value.tobytes()
+
+
+def _numpy_loads(data: bytes) -> Any:
+    """Rebuild a numpy array written by ``_numpy_dumps``."""
+    numpy = _require("numpy")
+    end = data.index(b"\n")
+    dtype, shape = data[1:end].decode("ascii").split(":")
+    dims = tuple([int(dim) for dim in shape.split(",") if dim])
+    # Copy so the result is writable, like an unpickled array
+    return numpy.frombuffer(data, dtype=dtype, offset=end + 1).reshape(dims).copy()
+
+
+def _auto_dumps(value: Any) -> bytes:
+    """
+    Serialize plain data with msgpack, plain numpy arrays as raw data, and
+    anything else with pickle.
+    """
+    data = _numpy_dumps(value)
+    if data is not None:
+        return data
+    if _is_msgpack_native(value):
+        try:
+            return _msgpack_dumps(value)
+        except (OverflowError, UnicodeEncodeError):
+            # Integers beyond 64 bits, or strings with lone surrogates
+            pass
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data: bytes) -> Any:
+    """
+    Deserialize a value written by any of the supported serializers.
+
+    Args:
+        data: The serialized value
+
+    Returns:
+        The deserialized value
+    """
+    tag = data[:1]
+    if tag == _ORJSON_TAG:
+        return _require("orjson").loads(memoryview(data)[1:])
+    if tag == _MSGPACK_TAG:
+        # Maps written by the 'msgpack' serializer may have non-string keys
+        return _require("msgpack").unpackb(
+            memoryview(data)[1:], raw=False, strict_map_key=False
+        )
+    if tag == _NUMPY_TAG:
+        return _numpy_loads(data)
+    return pickle.loads(data)
@@ -0,0 +1,28 @@
+"""Single-key scenarios shared by the backend test suites."""
+
+# (method, key, value stored beforehand or None, expected result)
+BASIC_OPS_CASES = (
+    ("get", "key1", "value1", "value1"),
+    ("get", "nonexistent", None, None),
+    ("exists", "key1", "value1", True),
+    ("exists", "key1", None, False),
+    ("delete", "key1", "value1", True),
+    ("delete", "nonexistent", None, False),
+)
+
+
+def check_basic_op(cache, method, key, value, expected):
+    """Run one of the BASIC_OPS_CASES against a cache backend."""
+    if value is not None:
+        cache.set(key, value)
+
+    result = getattr(cache, method)(key)
+    if isinstance(expected, bool) or expected is None:
+        assert result is expected
+    else:
+        assert result == expected
+
+    if method == "delete":
+        # The key is gone afterwards, so deleting it again finds nothing
+        assert cache.get(key) is None
+        assert cache.delete(key) is False
@@ -1,5 +1,8 @@
 """Pytest configuration and fixtures for nicolas-cache tests."""
 
+import re
+from types import MappingProxyType
+
 import pytest
 
 try:
@@ -9,6 +12,9 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
+# Words in a (lowercased) test node id that select automatic markers
+_MARKER_WORDS = re.compile(r"redis|sentinel|integration|full_")
+
 
 @pytest.fixture(scope="session")
 def redis_server():
@@ -46,37 +52,51 @@ def clean_redis(redis_server):
     redis_server.flushdb()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_data():
-    """Fixture providing sample test data."""
-    return {
-        "simple_string": "hello world",
-        "simple_number": 42,
-        "simple_list": [1, 2, 3, 4, 5],
-        "simple_dict": {"key": "value", "nested": {"inner": "data"}},
-        "complex_data": {
-            "users": [
-                {"id": 1, "name": "Alice", "active": True},
-                {"id": 2, "name": "Bob", "active": False},
-            ],
-            "settings": {
-                "theme": "dark",
-                "notifications": True,
-                "limits": {"max_items": 100, "timeout": 30},
+    """
+    Session-scoped fixture providing sample test data.
+
+    The data is shared by all tests, so it is returned as a read-only mapping.
+    Copy nested values before modifying them.
+    """
+    return MappingProxyType(
+        {
+            "simple_string": "hello world",
+            "simple_number": 42,
+            "simple_list": [1, 2, 3, 4, 5],
+            "simple_dict": {"key": "value", "nested": {"inner": "data"}},
+            "complex_data": {
+                "users": [
+                    {"id": 1, "name": "Alice", "active": True},
+                    {"id": 2, "name": "Bob", "active": False},
+                ],
+                "settings": {
+                    "theme": "dark",
+                    "notifications": True,
+                    "limits": {"max_items": 100, "timeout": 30},
+                },
             },
-        },
-    }
+        }
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_tags():
-    """Fixture providing sample tag data."""
-    return {
-        "user_tags": ["user", "profile", "active"],
-        "system_tags": ["system", "config", "internal"],
-        "shared_tags": ["shared", "common"],
-        "special_tags": ["special-chars", "with_underscore", "with.dot"],
-    }
+    """
+    Session-scoped fixture providing sample tag data.
+
+    The data is shared by all tests, so it is returned as a read-only mapping
+    of tag tuples.
+    """
+    return MappingProxyType(
+        {
+            "user_tags": ("user", "profile", "active"),
+            "system_tags": ("system", "config", "internal"),
+            "shared_tags": ("shared", "common"),
+            "special_tags": ("special-chars", "with_underscore", "with.dot"),
+        }
+    )
 
 
 @pytest.fixture(params=["memory"])
@@ -128,6 +148,9 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "sentinel: mark test as requiring Redis Sentinel"
     )
+    config.addinivalue_line(
+        "markers", "performance: mark test as guarding against a slowdown"
+    )
 
 
 def pytest_collection_modifyitems(config, items):
@@ -138,16 +161,21 @@ def pytest_collection_modifyitems(config, items):
     and requirements.
     """
     for item in items:
+        # One scan per item; a node id can match several marker words
+        found = set(_MARKER_WORDS.findall(item.nodeid.lower()))
+        if not found:
+            continue
+
         # Add redis marker to Redis-related tests
-        if "redis" in item.nodeid.lower() and "test_redis" in item.nodeid:
+        if "redis" in found and "test_redis" in item.nodeid:
             item.add_marker(pytest.mark.redis)
 
         # Add sentinel marker to Sentinel-related tests
-        if "sentinel" in item.nodeid.lower():
+        if "sentinel" in found:
             item.add_marker(pytest.mark.sentinel)
 
         # Add integration marker to certain test patterns
-        if any(pattern in item.nodeid.lower() for pattern in ["integration", "full_"]):
+        if "integration" in found or "full_" in found:
             item.add_marker(pytest.mark.integration)
 
 
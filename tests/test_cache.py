@@ -1,3 +1,4 @@
+import pickle
 import pytest
 from unittest.mock import Mock, patch
 
@@ -19,6 +20,13 @@ class TestCache:
         cache = Cache(backend="memory")
         assert cache._backend.__class__.__name__ == "MemoryCache"
 
+    def test_memory_backend_maxsize(self):
+        """Test that backend arguments are passed to the memory backend."""
+        cache = Cache(backend="memory", maxsize=1)
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        assert cache.getall() == {"key2": "value2"}
+
     @pytest.mark.skipif(not REDIS_AVAILABLE, reason="Redis package not installed")
     def test_redis_backend_initialization(self):
         """Test initializing cache with Redis backend."""
@@ -127,16 +135,6 @@ class TestCache:
                     return 1
                 return 0
 
-            def mock_scard(key):
-                return len(redis_sets.get(key, set()))
-
-            def mock_keys(pattern):
-                return [
-                    k.encode()
-                    for k in redis_data.keys()
-                    if k.startswith(pattern.replace("*", ""))
-                ]
-
             mock_redis.set = mock_set
             mock_redis.get = mock_get
             mock_redis.exists = mock_exists
@@ -144,10 +142,10 @@ class TestCache:
             mock_redis.sadd = mock_sadd
             mock_redis.smembers = mock_smembers
             mock_redis.srem = mock_srem
-            mock_redis.scard = mock_scard
-            mock_redis.keys = mock_keys
             mock_redis.setex = Mock()
             mock_redis.expire = Mock()
+            # Queue pipelined commands straight onto the mocked client
+            mock_redis.pipeline.return_value = mock_redis
 
             # Test cache operations
             cache = Cache(backend="redis", host="localhost", port=6379)
@@ -168,7 +166,10 @@ class TestCache:
 
         # Test Redis backend parameters
         if REDIS_AVAILABLE:
-            with patch("redis.Redis") as mock_redis:
+            with (
+                patch("redis.ConnectionPool") as mock_pool,
+                patch("redis.Redis") as mock_redis,
+            ):
                 mock_redis.return_value = Mock()
                 cache = Cache(
                     backend="redis",
@@ -177,16 +178,22 @@ class TestCache:
                     db=1,
                     password="testpass",
                     prefix="test:",
+                    max_connections=20,
                 )
 
-                # Verify Redis was called with correct parameters
-                mock_redis.assert_called_with(
+                # Verify the connection pool was built with correct parameters
+                mock_pool.assert_called_with(
+                    max_connections=20,
                     host="testhost",
                     port=6380,
                     db=1,
                     password="testpass",
+                    socket_timeout=None,
+                    socket_keepalive=True,
+                    socket_keepalive_options={},
                     decode_responses=False,
                 )
+                mock_redis.assert_called_with(connection_pool=mock_pool.return_value)
 
     def test_cache_interface_consistency(self):
         """Test that all backends provide the same interface."""
@@ -257,16 +264,16 @@ class TestCache:
                 mock_redis.sadd = Mock()
                 mock_redis.smembers = Mock(return_value=set())
                 mock_redis.delete = Mock()
+                mock_redis.pipeline.return_value = mock_redis
 
                 redis_cache = Cache(backend="redis")
                 redis_cache.set("complex", test_data)
 
-                # Verify data was pickled and stored
-                import pickle
-
+                # Verify data was pickled with the newest protocol and stored
                 assert "cache:complex" in stored_data
-                unpickled_data = pickle.loads(stored_data["cache:complex"])
-                assert unpickled_data == test_data
+                stored_value = stored_data["cache:complex"]
+                assert stored_value[1] == pickle.HIGHEST_PROTOCOL
+                assert pickle.loads(stored_value) == test_data
 
     def test_tag_operations_consistency(self):
         """Test tag operations work consistently across backends."""
@@ -1,5 +1,33 @@
+from collections import OrderedDict
+
+import pytest
+
 from nicolas.memory import MemoryCache
 
+from ._basic_ops_cases import BASIC_OPS_CASES, check_basic_op
+
+
+class _ScanCountingDict(OrderedDict):
+    """An OrderedDict that counts how often it is iterated over."""
+
+    scans = 0
+
+    def __iter__(self):
+        self.scans += 1
+        return super().__iter__()
+
+    def keys(self):
+        self.scans += 1
+        return super().keys()
+
+    def values(self):
+        self.scans += 1
+        return super().values()
+
+    def items(self):
+        self.scans += 1
+        return super().items()
+
 
 class TestMemoryCache:
     """Test suite for the MemoryCache backend."""
@@ -8,31 +36,21 @@ class TestMemoryCache:
         """Set up test fixtures."""
         self.cache = MemoryCache()
 
-    def test_set_and_get(self):
-        """Test basic set and get operations."""
-        self.cache.set("key1", "value1")
-        assert self.cache.get("key1") == "value1"
-
-    def test_get_nonexistent_key(self):
-        """Test getting a key that doesn't exist."""
-        assert self.cache.get("nonexistent") is None
-
-    def test_exists(self):
-        """Test checking if a key exists."""
-        assert self.cache.exists("key1") is False
-        self.cache.set("key1", "value1")
-        assert self.cache.exists("key1") is True
-
-    def test_delete(self):
-        """Test deleting a key."""
-        self.cache.set("key1", "value1")
-        assert self.cache.delete("key1") is True
-        assert self.cache.get("key1") is None
-        assert self.cache.delete("key1") is False  # Already deleted
-
-    def test_delete_nonexistent(self):
-        """Test deleting a non-existent key."""
-        assert self.cache.delete("nonexistent") is False
+    @pytest.mark.parametrize("method,key,value,expected", BASIC_OPS_CASES)
+    def test_basic_operations(self, method, key, value, expected):
+        """Test get, exists and delete on a single key."""
+        check_basic_op(self.cache, method, key, value, expected)
+
+    def test_exists_many(self):
+        """Test checking several keys at once."""
+        self.cache.set("a", "1")
+        self.cache.set("b", "2")
+        assert self.cache.exists_many(["a", "b", "c"]) == {
+            "a": True,
+            "b": True,
+            "c": False,
+        }
+        assert self.cache.exists_many([]) == {}
 
     def test_getall(self):
         """Test getting all cache entries."""
@@ -134,6 +152,8 @@ class TestMemoryCache:
 
         # Custom object
         class TestObject:
+            __slots__ = ("x", "y")
+
             def __init__(self, x, y):
                 self.x = x
                 self.y = y
@@ -157,9 +177,86 @@ class TestMemoryCache:
         self.cache.set("key1", "value1", tags=[])
         assert self.cache.get("key1") == "value1"
 
+    @pytest.mark.performance
+    def test_delete_by_tag_is_sublinear(self):
+        """Test that delete_by_tag never scans the whole cache."""
+        entries = self.cache._entries = _ScanCountingDict()
+        for i in range(10_000):
+            self.cache.set(f"key{i}", i, tags=["hot"] if i < 5 else ["cold"])
+
+        entries.scans = 0
+        assert self.cache.delete_by_tag("hot") == 5
+        # Only the tag's own index may be walked, not every entry
+        assert entries.scans == 0
+        assert len(self.cache.getall()) == 9_995
+
+    def test_non_string_tags(self):
+        """Test that tags other than plain strings are accepted."""
+
+        class Label(str):
+            pass
+
+        self.cache.set("key1", "value1", tags=[1, Label("label")])
+        assert self.cache.get_by_tag(1) == {"key1": "value1"}
+        assert self.cache.get_by_tag("label") == {"key1": "value1"}
+        assert self.cache.delete_by_tag(1) == 1
+
     def test_duplicate_tags(self):
         """Test setting a value with duplicate tags."""
         self.cache.set("key1", "value1", tags=["tag1", "tag1", "tag2"])
         tag1_entries = self.cache.get_by_tag("tag1")
         assert len(tag1_entries) == 1
         assert tag1_entries["key1"] == "value1"
+
+        # Duplicates are dropped before the key is registered under its tags
+        assert self.cache._entries["key1"].tags == frozenset({"tag1", "tag2"})
+        assert len(self.cache._tag_registry["tag1"]) == 1
+
+    def test_maxsize_evicts_least_recently_used(self):
+        """Test that a bounded cache evicts the least recently used entry."""
+        cache = MemoryCache(maxsize=2)
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+
+        # Reading key1 makes key2 the least recently used entry
+        assert cache.get("key1") == "value1"
+        cache.set("key3", "value3")
+
+        assert cache.exists("key2") is False
+        assert cache.getall() == {"key1": "value1", "key3": "value3"}
+
+    def test_eviction_removes_tags(self):
+        """Test that evicted entries are removed from their tags."""
+        cache = MemoryCache(maxsize=1)
+        cache.set("key1", "value1", tags=["tag1", "shared"])
+        cache.set("key2", "value2", tags=["shared"])
+
+        assert cache.get_by_tag("tag1") == {}
+        assert cache.get_by_tag("shared") == {"key2": "value2"}
+        assert cache.delete_by_tag("shared") == 1
+
+    def test_invalid_maxsize(self):
+        """Test that a non-positive maxsize is rejected."""
+        with pytest.raises(ValueError, match="maxsize must be a positive integer"):
+            MemoryCache(maxsize=0)
+
+    def test_tags_after_many_updates(self):
+        """Test that tag lookups stay correct as removed entries pile up."""
+        for i in range(3000):
+            self.cache.set(f"key{i % 3}", i, tags=["all", f"tag{i % 3}"])
+        self.cache.delete("key0")
+
+        assert self.cache.get_by_tag("all") == {"key1": 2998, "key2": 2999}
+        assert self.cache.get_by_tag("tag0") == {}
+        assert self.cache.get_by_tag("tag1") == {"key1": 2998}
+        assert self.cache.delete_by_tag("all") == 2
+        assert self.cache.getall() == {}
+
+    def test_untagged_update_of_tagged_key(self):
+        """Test that setting a tagged key without tags removes its tags."""
+        self.cache.set("key1", "value1", tags=["tag1"])
+        self.cache.set("key1", "value2")
+        self.cache.set("key1", "value3")
+
+        assert self.cache.get("key1") == "value3"
+        assert self.cache.get_by_tag("tag1") == {}
@@ -1,79 +1,100 @@
+import os
+import pickle
 import pytest
-import time
 from dataclasses import dataclass
+from unittest.mock import Mock
 
-try:
-    import redis
+from nicolas.redis import RedisCache
 
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+from ._basic_ops_cases import BASIC_OPS_CASES, check_basic_op
+
+redis = pytest.importorskip("redis")
+
+# Each pytest-xdist worker gets its own key prefix, so test classes running
+# in parallel against the same Redis server never see each other's keys
+_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "")
+_WORKER_SUFFIX = f"{_WORKER}:" if _WORKER else ""
+TEST_PREFIX = f"test:cache:{_WORKER_SUFFIX}"
+CUSTOM_PREFIX = f"custom:prefix:{_WORKER_SUFFIX}"
+
+
+def _unlink_matching(client, pattern):
+    """Remove all keys matching a pattern without blocking the server."""
+    pipe = client.pipeline(transaction=False)
+    for key in client.scan_iter(match=pattern, count=500):
+        pipe.unlink(key)
+    pipe.execute()
 
-from nicolas.redis import RedisCache
+
+@pytest.fixture(scope="class")
+def class_cache():
+    """Share one cache, and its connection pool, across a test class."""
+    cache = RedisCache(prefix=TEST_PREFIX)
+    try:
+        cache.redis.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis server not available")
+    yield cache
+    cache.redis.connection_pool.disconnect()
 
 
 @dataclass
 class SampleObject:
     """Sample object for pickling tests."""
 
+    # Declared by hand, as dataclass(slots=True) needs Python 3.10
+    __slots__ = ("x", "y")
+
     x: int
     y: int
 
 
-@pytest.mark.skipif(not REDIS_AVAILABLE, reason="Redis package not installed")
 class TestRedisCache:
     """Test suite for the RedisCache backend."""
 
     @pytest.fixture(autouse=True)
-    def setup_teardown(self):
+    def setup_teardown(self, class_cache):
         """Set up and tear down test fixtures."""
         # Setup
-        try:
-            self.cache = RedisCache(prefix="test:cache:")
-            # Clear any existing test data
-            self._clear_test_data()
-            yield
-        except redis.ConnectionError:
-            pytest.skip("Redis server not available")
-        finally:
-            # Teardown - clean up test data
-            self._clear_test_data()
+        self.cache = class_cache
+        # Clear any existing test data
+        self._clear_test_data()
+        yield
+        # Teardown - clean up test data
+        self._clear_test_data()
 
     def _clear_test_data(self):
         """Clear all test data from Redis."""
         try:
-            # Get all keys with our test prefix
-            keys = self.cache.redis.keys("test:cache:*")
-            if keys:
-                self.cache.redis.delete(*keys)
+            _unlink_matching(self.cache.redis, f"{TEST_PREFIX}*")
+            self.cache.redis.unlink(self.cache.index_key, self.cache.index_built_key)
         except Exception:
             pass
 
-    def test_set_and_get(self):
-        """Test basic set and get operations."""
-        self.cache.set("key1", "value1")
-        assert self.cache.get("key1") == "value1"
-
-    def test_get_nonexistent_key(self):
-        """Test getting a key that doesn't exist."""
-        assert self.cache.get("nonexistent") is None
-
-    def test_exists(self):
-        """Test checking if a key exists."""
-        assert self.cache.exists("key1") is False
-        self.cache.set("key1", "value1")
-        assert self.cache.exists("key1") is True
-
-    def test_delete(self):
-        """Test deleting a key."""
-        self.cache.set("key1", "value1")
-        assert self.cache.delete("key1") is True
-        assert self.cache.get("key1") is None
-        assert self.cache.delete("key1") is False  # Already deleted
-
-    def test_delete_nonexistent(self):
-        """Test deleting a non-existent key."""
-        assert self.cache.delete("nonexistent") is False
+    def _fake_cache(self):
+        """Create a cache backed by an in-process fake Redis."""
+        fakeredis = pytest.importorskip("fakeredis")
+        return RedisCache(prefix=TEST_PREFIX, redis_client=fakeredis.FakeStrictRedis())
+
+    @pytest.mark.parametrize("method,key,value,expected", BASIC_OPS_CASES)
+    def test_basic_operations(self, method, key, value, expected):
+        """Test get, exists and delete on a single key."""
+        check_basic_op(self.cache, method, key, value, expected)
+
+    def test_exists_many(self, monkeypatch):
+        """Test checking several keys in one round-trip."""
+        self.cache.set("a", "1")
+        self.cache.set("b", "2")
+        exists = Mock(wraps=self.cache.redis.exists)
+        monkeypatch.setattr(self.cache.redis, "exists", exists)
+
+        assert self.cache.exists_many(["a", "b", "c"]) == {
+            "a": True,
+            "b": True,
+            "c": False,
+        }
+        assert self.cache.exists_many([]) == {}
+        exists.assert_not_called()  # Sent through a pipeline instead
 
     def test_getall(self):
         """Test getting all cache entries."""
@@ -87,6 +108,33 @@ class TestRedisCache:
         assert all_entries["key2"] == "value2"
         assert all_entries["key3"] == "value3"
 
+    def test_getall_many_keys(self, monkeypatch):
+        """Test getting all entries when they span several fetch batches."""
+        monkeypatch.setattr("nicolas.redis._MGET_BATCH_SIZE", 2)
+        for i in range(5):
+            self.cache.set(f"key{i}", i, tags=["bulk"])
+
+        all_entries = self.cache.getall()
+        assert all_entries == {f"key{i}": i for i in range(5)}
+        assert self.cache.get_by_tag("bulk") == all_entries
+
+    def test_bulk_reads_use_mget(self, monkeypatch):
+        """Test that getall and get_by_tag fetch values in one MGET."""
+        self.cache.set("key1", "value1", tags=["tag1"])
+        self.cache.set("key2", "value2", tags=["tag1"])
+        mget = Mock(wraps=self.cache.redis.mget)
+        get = Mock(wraps=self.cache.redis.get)
+        monkeypatch.setattr(self.cache.redis, "mget", mget)
+        monkeypatch.setattr(self.cache.redis, "get", get)
+
+        assert self.cache.getall() == {"key1": "value1", "key2": "value2"}
+        mget.assert_called_once()
+
+        mget.reset_mock()
+        assert self.cache.get_by_tag("tag1") == {"key1": "value1", "key2": "value2"}
+        mget.assert_called_once()
+        get.assert_not_called()
+
     def test_set_with_tags(self):
         """Test setting values with tags."""
         self.cache.set("key1", "value1", tags=["tag1", "tag2"])
@@ -141,6 +189,31 @@ class TestRedisCache:
         assert self.cache.get_by_tag("tag1") == {}
         assert len(self.cache.get_by_tag("tag2")) == 1
 
+    def test_delete_by_tag_cleans_up_registry(self):
+        """Test that delete_by_tag removes all bookkeeping for deleted keys."""
+        self.cache.set("key1", "value1", tags=["tag1", "tag2"])
+        self.cache.set("key2", "value2", tags=["tag2"])
+
+        assert self.cache.delete_by_tag("tag1") == 1
+
+        redis_client = self.cache.redis
+        assert not redis_client.exists(f"{TEST_PREFIX}tag:tag1")
+        assert not redis_client.exists(f"{TEST_PREFIX}key_tags:key1")
+        assert redis_client.smembers(f"{TEST_PREFIX}tag:tag2") == {b"key2"}
+        assert redis_client.smembers(self.cache.index_key) == {b"key2"}
+
+    def test_delete_by_tag_many_keys(self, monkeypatch):
+        """Test deleting by tag when the entries span several batches."""
+        monkeypatch.setattr("nicolas.redis._DELETE_BATCH_SIZE", 2)
+        for i in range(5):
+            self.cache.set(f"key{i}", i, tags=["bulk", f"tag{i % 2}"])
+        self.cache.set("other", "value", tags=["tag0"])
+
+        assert self.cache.delete_by_tag("bulk") == 5
+        assert self.cache.getall() == {"other": "value"}
+        assert self.cache.get_by_tag("tag0") == {"other": "value"}
+        assert not self.cache.redis.exists(f"{TEST_PREFIX}tag:tag1")
+
     def test_delete_by_nonexistent_tag(self):
         """Test deleting by a non-existent tag."""
         count = self.cache.delete_by_tag("nonexistent")
@@ -162,35 +235,101 @@ class TestRedisCache:
         tag3_entries = self.cache.get_by_tag("tag3")
         assert tag3_entries["key1"] == "value1_updated"
 
+    def test_update_removes_empty_tag_sets(self):
+        """Test that tag sets emptied by an update are removed from Redis."""
+        self.cache.set("key1", "value1", tags=["tag1"])
+        self.cache.set("key1", "value1_updated", tags=["tag2"])
+
+        assert not self.cache.redis.exists(f"{TEST_PREFIX}tag:tag1")
+        assert self.cache.redis.smembers(f"{TEST_PREFIX}tag:tag2") == {b"key1"}
+
     def test_ttl(self):
         """Test TTL (time-to-live) functionality."""
-        # Set a key with 2 second TTL
-        self.cache.set("ttl_key", "ttl_value", ttl=2)
+        freezegun = pytest.importorskip("freezegun")
+        cache = self._fake_cache()
+
+        with freezegun.freeze_time() as frozen:
+            # Set a key with 2 second TTL
+            cache.set("ttl_key", "ttl_value", ttl=2)
 
-        # Verify it exists
-        assert self.cache.get("ttl_key") == "ttl_value"
-        assert self.cache.exists("ttl_key") is True
+            # Verify it exists
+            assert cache.get("ttl_key") == "ttl_value"
+            assert cache.exists("ttl_key") is True
 
-        # Wait for expiration
-        time.sleep(3)
+            # Move the clock past the expiration instead of waiting for it
+            frozen.tick(3)
 
-        # Verify it's expired
-        assert self.cache.get("ttl_key") is None
-        assert self.cache.exists("ttl_key") is False
+            # Verify it's expired
+            assert cache.get("ttl_key") is None
+            assert cache.exists("ttl_key") is False
 
     def test_ttl_with_tags(self):
         """Test TTL with tags."""
-        # Set a key with tags and TTL
-        self.cache.set("ttl_key", "ttl_value", tags=["ttl_tag"], ttl=2)
+        freezegun = pytest.importorskip("freezegun")
+        cache = self._fake_cache()
 
-        # Verify tag lookup works
-        assert len(self.cache.get_by_tag("ttl_tag")) == 1
+        with freezegun.freeze_time() as frozen:
+            # Set a key with tags and TTL
+            cache.set("ttl_key", "ttl_value", tags=["ttl_tag"], ttl=2)
 
-        # Wait for expiration
-        time.sleep(3)
+            # Verify tag lookup works
+            assert len(cache.get_by_tag("ttl_tag")) == 1
 
-        # Verify tag lookup returns empty after expiration
-        assert self.cache.get_by_tag("ttl_tag") == {}
+            # Move the clock past the expiration instead of waiting for it
+            frozen.tick(3)
+
+            # Verify tag lookup returns empty after expiration
+            assert cache.get_by_tag("ttl_tag") == {}
+
+    def test_getall_skips_expired_keys(self):
+        """Test that getall ignores and unindexes expired entries."""
+        self.cache.set("key1", "value1")
+        self.cache.set("key2", "value2")
+        # Simulate expiry of key2's value
+        self.cache.redis.delete(f"{TEST_PREFIX}key2")
+
+        assert self.cache.getall() == {"key1": "value1"}
+        assert self.cache.redis.smembers(self.cache.index_key) == {b"key1"}
+
+    def test_index_name_is_a_valid_cache_key(self):
+        """Test that no cache key collides with the index of all keys."""
+        self.cache.set("__index__", "value1")
+        self.cache.set("key2", "value2")
+
+        assert self.cache.get("__index__") == "value1"
+        assert self.cache.getall() == {"__index__": "value1", "key2": "value2"}
+
+    def test_index_pruned_without_getall(self, monkeypatch):
+        """Test that expired keys leave the index even if getall is never used."""
+        freezegun = pytest.importorskip("freezegun")
+        monkeypatch.setattr("nicolas.redis._PRUNE_INTERVAL", 5)
+        cache = self._fake_cache()
+
+        with freezegun.freeze_time() as frozen:
+            for i in range(20):
+                cache.set(f"old{i}", i, ttl=1)
+            frozen.tick(2)
+
+            # Later writes with a TTL prune the entries of the expired ones
+            for i in range(20):
+                cache.set(f"new{i}", i, ttl=60)
+
+            indexed = cache.redis.smembers(cache.index_key)
+            assert {f"new{i}".encode() for i in range(20)} <= indexed
+            assert len(indexed) < 40
+
+    def test_getall_includes_entries_written_before_index(self):
+        """Test that getall adds entries missing from the index once."""
+        cache = self._fake_cache()
+        # Written directly, as by a version that kept no index
+        cache.redis.set(f"{TEST_PREFIX}old", pickle.dumps("old_value"))
+        cache.redis.sadd(f"{TEST_PREFIX}tag:tag1", "old")
+        cache.redis.sadd(f"{TEST_PREFIX}key_tags:old", "tag1")
+        cache.set("new", "new_value")
+
+        assert cache.getall() == {"old": "old_value", "new": "new_value"}
+        assert cache.redis.exists(cache.index_built_key)
+        assert cache.redis.smembers(cache.index_key) == {b"old", b"new"}
 
     def test_complex_data_types(self):
         """Test storing complex data types."""
@@ -210,6 +349,18 @@ class TestRedisCache:
         assert retrieved.x == obj.x
         assert retrieved.y == obj.y
 
+    def test_msgpack_serializer(self):
+        """Test storing values with the msgpack serializer."""
+        pytest.importorskip("msgpack")
+        msgpack_cache = RedisCache(prefix=TEST_PREFIX, serializer="msgpack")
+        data_dict = {"name": "test", "value": 42, "nested": {"a": [1, 2]}}
+        msgpack_cache.set("dict_key", data_dict, tags=["tag1"])
+
+        assert msgpack_cache.get("dict_key") == data_dict
+        assert msgpack_cache.get_by_tag("tag1") == {"dict_key": data_dict}
+        # Values stay readable by a cache using a different serializer
+        assert self.cache.get("dict_key") == data_dict
+
     def test_none_value(self):
         """Test storing None as a value."""
         self.cache.set("none_key", None)
@@ -228,15 +379,33 @@ class TestRedisCache:
         assert len(tag1_entries) == 1
         assert tag1_entries["key1"] == "value1"
 
+    def test_connection_pool_options(self):
+        """Test that connection options are applied to the shared pool."""
+        pooled_cache = RedisCache(max_connections=5, socket_timeout=2.0)
+        pool = pooled_cache.redis.connection_pool
+        assert pool.max_connections == 5
+        assert pool.connection_kwargs["socket_timeout"] == 2.0
+        assert pool.connection_kwargs["socket_keepalive"] is True
+
+    def test_unix_socket_host(self):
+        """Test that a socket path as host selects a Unix socket connection."""
+        socket_cache = RedisCache(host="/tmp/redis.sock")
+        pool = socket_cache.redis.connection_pool
+        assert pool.connection_class is redis.UnixDomainSocketConnection
+        assert pool.connection_kwargs["path"] == "/tmp/redis.sock"
+
     def test_custom_prefix(self):
         """Test using a custom prefix."""
-        custom_cache = RedisCache(prefix="custom:prefix:")
+        custom_cache = RedisCache(prefix=CUSTOM_PREFIX)
         try:
             custom_cache.set("key1", "value1")
 
             # Verify the key is stored with custom prefix
-            assert custom_cache.redis.exists("custom:prefix:key1")
+            assert custom_cache.redis.exists(f"{CUSTOM_PREFIX}key1")
             assert custom_cache.get("key1") == "value1"
         finally:
             # Clean up
-            custom_cache.redis.delete("custom:prefix:key1")
+            _unlink_matching(custom_cache.redis, f"{CUSTOM_PREFIX}*")
+            custom_cache.redis.unlink(
+                custom_cache.index_key, custom_cache.index_built_key
+            )
@@ -1,214 +1,258 @@
+import pickle
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
-try:
-    import redis  # noqa: F401
-    from redis.sentinel import Sentinel  # noqa: F401
+from nicolas.sentinel import RedisSentinelCache
 
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+from ._basic_ops_cases import BASIC_OPS_CASES, check_basic_op
 
-from nicolas.sentinel import RedisSentinelCache
+pytest.importorskip("redis.sentinel")
+
+# Reply bytes for a cached "test_value", as stored by the default serializer
+PICKLED_TEST_VALUE = pickle.dumps("test_value", protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _record_commands(client):
+    """Record the names of the commands sent by a client, pipelined or not."""
+    sent = []
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    def recording_execute_command(*args, **options):
+        sent.append(args[0])
+        return execute_command(*args, **options)
+
+    def recording_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def recording_execute(*execute_args, **execute_kwargs):
+            sent.extend(command_args[0] for command_args, _ in pipe.command_stack)
+            return execute(*execute_args, **execute_kwargs)
+
+        pipe.execute = recording_execute
+        return pipe
+
+    client.execute_command = recording_execute_command
+    client.pipeline = recording_pipeline
+    return sent
+
+
+@pytest.fixture
+def sentinel_mocks():
+    """Patch Sentinel and wire up mocked master and slave clients."""
+    with patch("redis.sentinel.Sentinel") as sentinel_class:
+        sentinel, master, slave = Mock(), Mock(), Mock()
+        sentinel.master_for.return_value = master
+        sentinel.slave_for.return_value = slave
+        sentinel_class.return_value = sentinel
+        yield SimpleNamespace(
+            cls=sentinel_class, sentinel=sentinel, master=master, slave=slave
+        )
 
 
-@pytest.mark.skipif(not REDIS_AVAILABLE, reason="Redis package not installed")
 class TestRedisSentinelCache:
     """Test suite for the RedisSentinelCache backend."""
 
-    def test_initialization(self):
+    def test_initialization(self, sentinel_mocks):
         """Test basic initialization with mocked Sentinel."""
-        with patch("redis.sentinel.Sentinel") as mock_sentinel_class:
-            # Mock the sentinel instance and its methods
-            mock_sentinel = Mock()
-            mock_master = Mock()
-            mock_slave = Mock()
-
-            mock_sentinel.master_for.return_value = mock_master
-            mock_sentinel.slave_for.return_value = mock_slave
-            mock_sentinel_class.return_value = mock_sentinel
-
-            # Create cache instance
-            RedisSentinelCache(
-                sentinels=[("localhost", 26379)],
-                service_name="mymaster",
-                db=0,
-                password="password",
-            )
-
-            # Verify Sentinel was initialized correctly
-            mock_sentinel_class.assert_called_once()
-            call_args = mock_sentinel_class.call_args
-            assert call_args[0][0] == [("localhost", 26379)]
-
-            # Verify master_for was called during initialization
-            mock_sentinel.master_for.assert_called_once_with(
-                "mymaster",
-                socket_timeout=0.1,
-                db=0,
-                password="password",
-                decode_responses=False,
-            )
-
-    def test_read_operations_use_slave(self):
-        """Test that read operations use slave connections."""
-        with patch("redis.sentinel.Sentinel") as mock_sentinel_class:
-            # Setup mocks
-            mock_sentinel = Mock()
-            mock_master = Mock()
-            mock_slave = Mock()
+        # Create cache instance
+        RedisSentinelCache(
+            sentinels=[("localhost", 26379)],
+            service_name="mymaster",
+            db=0,
+            password="password",
+        )
+
+        # Verify Sentinel was initialized correctly
+        sentinel_mocks.cls.assert_called_once()
+        call_args = sentinel_mocks.cls.call_args
+        assert call_args[0][0] == [("localhost", 26379)]
+
+        # Verify master_for was called during initialization
+        sentinel_mocks.sentinel.master_for.assert_called_once_with(
+            "mymaster",
+            socket_timeout=0.1,
+            db=0,
+            password="password",
+            decode_responses=False,
+            max_connections=None,
+            health_check_interval=30,
+        )
+
+    def test_clients_are_reused(self, sentinel_mocks):
+        """Test that operations reuse the clients created at initialization."""
+        sentinel_mocks.slave.get.return_value = None
+
+        cache = RedisSentinelCache(
+            sentinels=[("localhost", 26379)], service_name="mymaster"
+        )
+        for i in range(3):
+            cache.set(f"key{i}", i)
+            cache.get(f"key{i}")
+
+        sentinel_mocks.sentinel.master_for.assert_called_once()
+        sentinel_mocks.sentinel.slave_for.assert_called_once()
 
-            mock_sentinel.master_for.return_value = mock_master
-            mock_sentinel.slave_for.return_value = mock_slave
-            mock_sentinel_class.return_value = mock_sentinel
+    def test_connection_pool_options(self, sentinel_mocks):
+        """Test that pool options are passed to the master and slave pools."""
+        RedisSentinelCache(
+            sentinels=[("localhost", 26379)],
+            service_name="mymaster",
+            max_connections=50,
+            health_check_interval=10,
+        )
 
-            # Configure slave to return test data
-            import pickle
+        for factory in (
+            sentinel_mocks.sentinel.master_for,
+            sentinel_mocks.sentinel.slave_for,
+        ):
+            kwargs = factory.call_args.kwargs
+            assert kwargs["max_connections"] == 50
+            assert kwargs["health_check_interval"] == 10
 
-            mock_slave.get.return_value = pickle.dumps("test_value")
-            mock_slave.smembers.return_value = set()
-            mock_slave.keys.return_value = []
-            mock_slave.exists.return_value = True
+    def test_read_operations_use_slave(self, sentinel_mocks):
+        """Test that read operations use slave connections."""
+        # Configure slave to return test data
+        sentinel_mocks.slave.get.return_value = PICKLED_TEST_VALUE
+        sentinel_mocks.slave.smembers.return_value = set()
+        sentinel_mocks.slave.scan_iter.return_value = iter([])
+        sentinel_mocks.slave.exists.return_value = True
+
+        cache = RedisSentinelCache(
+            sentinels=[("localhost", 26379)], service_name="mymaster"
+        )
 
-            cache = RedisSentinelCache(
-                sentinels=[("localhost", 26379)], service_name="mymaster"
-            )
+        # Test read operations
+        assert cache.get("key1") == "test_value"
+        sentinel_mocks.slave.get.assert_called_once_with("cache:key1")
 
-            # Test read operations
-            cache.get("key1")
-            mock_slave.get.assert_called_once_with("cache:key1")
+        cache.get_by_tag("tag1")
+        sentinel_mocks.slave.smembers.assert_called()
 
-            cache.get_by_tag("tag1")
-            mock_slave.smembers.assert_called()
+        cache.getall()
+        sentinel_mocks.slave.scan_iter.assert_called_once_with(
+            match="cache:*", count=1000
+        )
 
-            cache.getall()
-            mock_slave.keys.assert_called()
+        cache.exists("key1")
+        sentinel_mocks.slave.exists.assert_called()
 
-            cache.exists("key1")
-            mock_slave.exists.assert_called()
+        sentinel_mocks.slave.pipeline.return_value.execute.return_value = [1, 0]
+        assert cache.exists_many(["key1", "key2"]) == {
+            "key1": True,
+            "key2": False,
+        }
+        sentinel_mocks.slave.pipeline.assert_called_once_with(transaction=False)
 
-    def test_write_operations_use_master(self):
+    def test_write_operations_use_master(self, sentinel_mocks):
         """Test that write operations use master connections."""
-        with patch("redis.sentinel.Sentinel") as mock_sentinel_class:
-            # Setup mocks
-            mock_sentinel = Mock()
-            mock_master = Mock()
-            mock_slave = Mock()
+        # Configure mocks
+        sentinel_mocks.slave.exists.return_value = True
+        script = sentinel_mocks.master.register_script.return_value
+        script.return_value = 1
 
-            mock_sentinel.master_for.return_value = mock_master
-            mock_sentinel.slave_for.return_value = mock_slave
-            mock_sentinel_class.return_value = mock_sentinel
+        cache = RedisSentinelCache(
+            sentinels=[("localhost", 26379)], service_name="mymaster"
+        )
+
+        # Test write operations
+        cache.set("key1", "value1")
+        script.assert_called()
+
+        assert cache.delete("key1") is True
+        assert script.call_args.kwargs["keys"] == [
+            "cache:key1",
+            "cache:key_tags:key1",
+        ]
+        sentinel_mocks.slave.exists.assert_not_called()
+
+    def test_delete_by_tag_batches_writes(self, sentinel_mocks):
+        """Test that delete_by_tag removes all entries in one pipeline."""
+        read_pipe = Mock()
+        write_pipe = Mock()
+
+        key_tags = {
+            "cache:key_tags:key1": {b"tag1", b"tag2"},
+            "cache:key_tags:key2": {b"tag1"},
+        }
+        sentinel_mocks.master.smembers.return_value = {b"key1", b"key2"}
+        sentinel_mocks.master.pipeline.side_effect = [read_pipe, write_pipe]
+        read_pipe.execute.side_effect = lambda: [
+            key_tags[call.args[0]] for call in read_pipe.smembers.call_args_list
+        ]
+        write_pipe.execute.return_value = [2, 2, 1, 1]
 
-            # Configure mocks
-            mock_slave.exists.return_value = True
-            mock_slave.smembers.return_value = set()
-            mock_master.smembers.return_value = set()
+        cache = RedisSentinelCache(
+            sentinels=[("localhost", 26379)], service_name="mymaster"
+        )
 
-            cache = RedisSentinelCache(
-                sentinels=[("localhost", 26379)], service_name="mymaster"
-            )
+        assert cache.delete_by_tag("tag1") == 2
+        write_pipe.execute.assert_called_once()
+        deleted = [set(call.args) for call in write_pipe.delete.call_args_list]
+        assert deleted == [{"cache:key1", "cache:key2"}]
+        unlinked = [set(call.args) for call in write_pipe.unlink.call_args_list]
+        assert unlinked == [
+            {"cache:key_tags:key1", "cache:key_tags:key2"},
+            {"cache:tag:tag1"},
+        ]
+        write_pipe.srem.assert_called_once_with("cache:tag:tag2", "key1")
+
+        # Everything goes through the master client created at startup
+        sentinel_mocks.sentinel.master_for.assert_called_once()
+        sentinel_mocks.master.delete.assert_not_called()
+
+    def test_serializer_option(self, sentinel_mocks):
+        """Test that values are written with the configured serializer."""
+        pytest.importorskip("msgpack")
 
-            # Test write operations
-            cache.set("key1", "value1")
-            mock_master.set.assert_called()
+        cache = RedisSentinelCache(
+            sentinels=[("localhost", 26379)],
+            service_name="mymaster",
+            serializer="auto",
+        )
+        cache.set("key1", {"a": 1})
 
-            cache.delete("key1")
-            mock_master.delete.assert_called()
+        script = sentinel_mocks.master.register_script.return_value
+        stored_value = script.call_args.kwargs["args"][0]
+        assert stored_value[:1] == b"M"
 
-    def test_sentinel_with_password(self):
+    def test_sentinel_with_password(self, sentinel_mocks):
         """Test Sentinel initialization with sentinel password."""
-        with patch("redis.sentinel.Sentinel") as mock_sentinel_class:
-            mock_sentinel = Mock()
-            mock_master = Mock()
-
-            mock_sentinel.master_for.return_value = mock_master
-            mock_sentinel_class.return_value = mock_sentinel
-
-            RedisSentinelCache(
-                sentinels=[("localhost", 26379)],
-                service_name="mymaster",
-                sentinel_password="sentinel_pass",
-            )
-
-            # Verify sentinel password was passed
-            call_args = mock_sentinel_class.call_args
-            assert "password" in call_args[1]
-            assert call_args[1]["password"] == "sentinel_pass"
-
-    @patch("redis.sentinel.Sentinel")
-    def test_full_cache_operations(self, mock_sentinel_class):
+        RedisSentinelCache(
+            sentinels=[("localhost", 26379)],
+            service_name="mymaster",
+            sentinel_password="sentinel_pass",
+        )
+
+        # Verify sentinel password was passed
+        call_args = sentinel_mocks.cls.call_args
+        assert "password" in call_args[1]
+        assert call_args[1]["password"] == "sentinel_pass"
+
+    @pytest.mark.parametrize("method,key,value,expected", BASIC_OPS_CASES)
+    def test_basic_operations(self, sentinel_mocks, method, key, value, expected):
+        """Test get, exists and delete on a single key."""
+        fakeredis = pytest.importorskip("fakeredis")
+        fake = fakeredis.FakeStrictRedis()
+        sentinel_mocks.sentinel.master_for.return_value = fake
+        sentinel_mocks.sentinel.slave_for.return_value = fake
+
+        cache = RedisSentinelCache(
+            sentinels=[("localhost", 26379)], service_name="mymaster"
+        )
+        check_basic_op(cache, method, key, value, expected)
+
+    def test_full_cache_operations(self, sentinel_mocks):
         """Test full cache operations with mocked Sentinel."""
-        # Setup comprehensive mocks
-        mock_sentinel = Mock()
-        mock_master = Mock()
-        mock_slave = Mock()
-
-        mock_sentinel.master_for.return_value = mock_master
-        mock_sentinel.slave_for.return_value = mock_slave
-        mock_sentinel_class.return_value = mock_sentinel
-
-        # Storage for mocked Redis data
-        redis_data = {}
-        redis_sets = {}
-
-        def mock_set(key, value):
-            redis_data[key] = value
-            return True
-
-        def mock_get(key):
-            return redis_data.get(key)
-
-        def mock_exists(key):
-            return key in redis_data
-
-        def mock_delete(key):
-            if key in redis_data:
-                del redis_data[key]
-                return 1
-            return 0
-
-        def mock_sadd(key, *values):
-            if key not in redis_sets:
-                redis_sets[key] = set()
-            redis_sets[key].update(values)
-            return len(values)
-
-        def mock_smembers(key):
-            return redis_sets.get(key, set())
-
-        def mock_srem(key, value):
-            if key in redis_sets:
-                redis_sets[key].discard(value)
-                return 1
-            return 0
-
-        def mock_scard(key):
-            return len(redis_sets.get(key, set()))
-
-        def mock_keys(pattern):
-            # Simple pattern matching for test
-            return [
-                k.encode()
-                for k in redis_data.keys()
-                if k.startswith(pattern.replace("*", ""))
-            ]
+        fakeredis = pytest.importorskip("fakeredis")
 
-        # Configure mocks
-        mock_master.set = mock_set
-        mock_master.get = mock_get
-        mock_master.exists = mock_exists
-        mock_master.delete = mock_delete
-        mock_master.sadd = mock_sadd
-        mock_master.smembers = mock_smembers
-        mock_master.srem = mock_srem
-        mock_master.scard = mock_scard
-        mock_master.setex = Mock()
-        mock_master.expire = Mock()
-
-        mock_slave.get = mock_get
-        mock_slave.exists = mock_exists
-        mock_slave.smembers = mock_smembers
-        mock_slave.keys = mock_keys
+        # One in-process fake server stands in for both master and replica
+        fake = fakeredis.FakeStrictRedis()
+        sentinel_mocks.sentinel.master_for.return_value = fake
+        sentinel_mocks.sentinel.slave_for.return_value = fake
+        sent = _record_commands(fake)
 
         # Create cache and test operations
         cache = RedisSentinelCache(
@@ -217,68 +261,81 @@ class TestRedisSentinelCache:
         )
 
         # Test basic set/get
-        import pickle
-
         cache.set("key1", "value1")
-        stored_value = mock_get("cache:key1")
+        stored_value = fake.get("cache:key1")
         assert stored_value is not None
         assert pickle.loads(stored_value) == "value1"
+        assert stored_value[1] == pickle.HIGHEST_PROTOCOL
+        assert cache.get("key1") == "value1"
 
         # Test with tags
         cache.set("key2", "value2", tags=["tag1", "tag2"])
-        assert "tag1" in mock_smembers("cache:key_tags:key2")
-        assert "tag2" in mock_smembers("cache:key_tags:key2")
-        assert "key2" in mock_smembers("cache:tag:tag1")
-        assert "key2" in mock_smembers("cache:tag:tag2")
-
-    def test_multiple_sentinels(self):
+        assert fake.smembers("cache:key_tags:key2") == {b"tag1", b"tag2"}
+        assert fake.smembers("cache:tag:tag1") == {b"key2"}
+        assert fake.smembers("cache:tag:tag2") == {b"key2"}
+
+        # Test updating tags
+        cache.set("key2", "value2_updated", tags=["tag3"])
+        assert not fake.exists("cache:tag:tag1")
+        assert fake.smembers("cache:tag:tag3") == {b"key2"}
+        assert pickle.loads(fake.get("cache:key2")) == "value2_updated"
+
+        # Test lookup by tag
+        cache.set("key3", "value3", tags=["tag3"])
+        assert cache.get_by_tag("tag3") == {"key2": "value2_updated", "key3": "value3"}
+
+        # Test getting all entries skips the tag registry keys
+        assert cache.getall() == {
+            "key1": "value1",
+            "key2": "value2_updated",
+            "key3": "value3",
+        }
+
+        # Test deleting by key and by tag
+        assert cache.delete("key1") is True
+        assert cache.exists("key1") is False
+        assert cache.delete_by_tag("tag3") == 2
+        assert cache.getall() == {}
+        assert fake.keys("cache:*") == []
+
+        # Redis drops empty tag sets itself, so they are never counted
+        assert sent
+        assert "SCARD" not in sent
+
+    def test_multiple_sentinels(self, sentinel_mocks):
         """Test initialization with multiple sentinel nodes."""
-        with patch("redis.sentinel.Sentinel") as mock_sentinel_class:
-            mock_sentinel = Mock()
-            mock_master = Mock()
-
-            mock_sentinel.master_for.return_value = mock_master
-            mock_sentinel_class.return_value = mock_sentinel
-
-            sentinels = [
-                ("sentinel1", 26379),
-                ("sentinel2", 26380),
-                ("sentinel3", 26381),
-            ]
+        sentinels = [
+            ("sentinel1", 26379),
+            ("sentinel2", 26380),
+            ("sentinel3", 26381),
+        ]
 
-            RedisSentinelCache(sentinels=sentinels, service_name="mymaster")
+        RedisSentinelCache(sentinels=sentinels, service_name="mymaster")
 
-            # Verify all sentinels were passed
-            call_args = mock_sentinel_class.call_args
-            assert call_args[0][0] == sentinels
+        # Verify all sentinels were passed
+        call_args = sentinel_mocks.cls.call_args
+        assert call_args[0][0] == sentinels
 
-    def test_socket_options(self):
+    def test_socket_options(self, sentinel_mocks):
         """Test initialization with custom socket options."""
-        with patch("redis.sentinel.Sentinel") as mock_sentinel_class:
-            mock_sentinel = Mock()
-            mock_master = Mock()
-
-            mock_sentinel.master_for.return_value = mock_master
-            mock_sentinel_class.return_value = mock_sentinel
-
-            keepalive_options = {
-                1: 1,  # TCP_KEEPIDLE
-                2: 1,  # TCP_KEEPINTVL
-                3: 5,  # TCP_KEEPCNT
-            }
-
-            RedisSentinelCache(
-                sentinels=[("localhost", 26379)],
-                service_name="mymaster",
-                socket_timeout=5.0,
-                socket_connect_timeout=2.0,
-                socket_keepalive=True,
-                socket_keepalive_options=keepalive_options,
-            )
-
-            # Verify socket options were passed
-            call_args = mock_sentinel_class.call_args
-            assert call_args[1]["socket_timeout"] == 5.0
-            assert call_args[1]["socket_connect_timeout"] == 2.0
-            assert call_args[1]["socket_keepalive"] is True
-            assert call_args[1]["socket_keepalive_options"] == keepalive_options
+        keepalive_options = {
+            1: 1,  # TCP_KEEPIDLE
+            2: 1,  # TCP_KEEPINTVL
+            3: 5,  # TCP_KEEPCNT
+        }
+
+        RedisSentinelCache(
+            sentinels=[("localhost", 26379)],
+            service_name="mymaster",
+            socket_timeout=5.0,
+            socket_connect_timeout=2.0,
+            socket_keepalive=True,
+            socket_keepalive_options=keepalive_options,
+        )
+
+        # Verify socket options were passed
+        call_args = sentinel_mocks.cls.call_args
+        assert call_args[1]["socket_timeout"] == 5.0
+        assert call_args[1]["socket_connect_timeout"] == 2.0
+        assert call_args[1]["socket_keepalive"] is True
+        assert call_args[1]["socket_keepalive_options"] == keepalive_options
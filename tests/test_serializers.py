@@ -0,0 +1,105 @@
+import os
+import pickle
+
+import pytest
+
+from nicolas.serializers import get_dumps, loads
+
+
+class TestSerializers:
+    """Test suite for the Redis value serializers."""
+
+    def test_pickle_round_trip(self):
+        """Test that pickle payloads round-trip and stay plain pickle."""
+        value = {"name": "test", "items": (1, 2, 3)}
+        data = get_dumps("pickle")(value)
+        assert pickle.loads(data) == value
+        assert loads(data) == value
+
+    def test_orjson_round_trip(self):
+        """Test that orjson payloads round-trip."""
+        pytest.importorskip("orjson")
+        value = {"name": "test", "items": [1, 2.5, None, True]}
+        data = get_dumps("orjson")(value)
+        assert data[:1] == b"J"
+        assert loads(data) == value
+
+    def test_msgpack_round_trip(self):
+        """Test that msgpack payloads round-trip."""
+        pytest.importorskip("msgpack")
+        value = {"name": "test", "raw": b"\x00\x01", "items": [1, 2.5, None]}
+        data = get_dumps("msgpack")(value)
+        assert data[:1] == b"M"
+        assert loads(data) == value
+
+    def test_msgpack_non_string_keys(self):
+        """Test that msgpack maps with int keys can be read back."""
+        pytest.importorskip("msgpack")
+        value = {1: "a", 2: {3: [4]}}
+        assert loads(get_dumps("msgpack")(value)) == value
+
+    def test_auto_serializer(self):
+        """Test that auto uses msgpack for plain data and pickle otherwise."""
+        pytest.importorskip("msgpack")
+        dumps = get_dumps("auto")
+
+        plain = {"name": "test", "items": [1, 2.5, None, b"raw"]}
+        assert dumps(plain)[:1] == b"M"
+        assert loads(dumps(plain)) == plain
+
+        fallbacks = [
+            (1, 2),
+            {1: "int key"},
+            {"big": 2**70},
+            {"a": {1, 2}},
+            os.fsdecode(b"file\xff.txt"),  # lone surrogate
+        ]
+        for value in fallbacks:
+            data = dumps(value)
+            assert data[:1] != b"M"
+            assert loads(data) == value
+
+    def test_auto_serializer_numpy_arrays(self):
+        """Test that auto stores plain numpy arrays as raw array data."""
+        pytest.importorskip("msgpack")
+        np = pytest.importorskip("numpy")
+        dumps = get_dumps("auto")
+
+        array = np.arange(12, dtype=">i4").reshape(3, 4)
+        data = dumps(array)
+        assert data[:1] == b"N"
+        restored = loads(data)
+        assert restored.dtype == array.dtype
+        assert np.array_equal(restored, array)
+        restored[0, 0] = 100  # Restored arrays are writable
+
+        # Arrays whose raw data does not describe their values use pickle
+        objects = np.array([1, "two"], dtype=object)
+        assert dumps(objects)[:1] != b"N"
+        assert list(loads(dumps(objects))) == [1, "two"]
+
+    def test_mixed_payloads(self):
+        """Test that payloads from different serializers decode side by side."""
+        pytest.importorskip("msgpack")
+        payloads = [get_dumps("pickle")("a"), get_dumps("msgpack")("b")]
+        assert [loads(data) for data in payloads] == ["a", "b"]
+
+    def test_unsupported_serializer(self):
+        """Test requesting an unknown serializer."""
+        with pytest.raises(ValueError, match="Unsupported serializer: yaml"):
+            get_dumps("yaml")
+
+    def test_pickle_uses_highest_protocol(self):
+        """Test that values are pickled with the newest protocol."""
+        data = get_dumps("pickle")([1, 2, 3])
+        assert data[:2] == bytes([0x80, pickle.HIGHEST_PROTOCOL])
+
+    def test_msgpack_packer_per_thread(self):
+        """Test that msgpack serialization works from several threads."""
+        pytest.importorskip("msgpack")
+        from concurrent.futures import ThreadPoolExecutor
+
+        dumps = get_dumps("msgpack")
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            payloads = list(pool.map(dumps, [{"n": i} for i in range(100)]))
+        assert [loads(data) for data in payloads] == [{"n": i} for i in range(100)]